@@ -0,0 +1,80 @@
+"""Shared LLM model construction for all agents.
+
+Every agent talks to the same provider, so they share one pooled
+httpx.AsyncClient: each run reuses warm keep-alive connections instead of
+paying TLS handshake and TCP slow-start per call.
+"""
+
+from functools import lru_cache
+
+import httpx
+from pydantic_ai import ModelSettings
+from pydantic_ai.models import Model, infer_model
+
+from app.config import settings
+
+
+@lru_cache(maxsize=1)
+def get_shared_http_client() -> httpx.AsyncClient:
+    """Build the pooled HTTP client shared by all provider calls."""
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        # LLM responses can stream for minutes; only the connect is kept tight
+        timeout=httpx.Timeout(600.0, connect=5.0),
+    )
+
+
+@lru_cache(maxsize=1)
+def get_llm_model() -> Model:
+    """Resolve the configured model with the shared HTTP client injected.
+
+    Falls back to PydanticAI's default inference (and its own client) for
+    providers we don't construct explicitly.
+    """
+    provider_name, _, model_name = settings.default_llm_model.partition(":")
+
+    if provider_name == "anthropic":
+        from pydantic_ai.models.anthropic import AnthropicModel
+        from pydantic_ai.providers.anthropic import AnthropicProvider
+
+        provider = AnthropicProvider(
+            api_key=settings.anthropic_api_key or None,
+            http_client=get_shared_http_client(),
+        )
+        return AnthropicModel(model_name, provider=provider)
+
+    if provider_name == "openai":
+        from pydantic_ai.models.openai import OpenAIChatModel
+        from pydantic_ai.providers.openai import OpenAIProvider
+
+        provider = OpenAIProvider(
+            api_key=settings.openai_api_key or None,
+            http_client=get_shared_http_client(),
+        )
+        return OpenAIChatModel(model_name, provider=provider)
+
+    return infer_model(settings.default_llm_model)
+
+
+@lru_cache(maxsize=1)
+def get_model_settings() -> ModelSettings:
+    """Build the shared model settings, enabling prompt caching when possible.
+
+    The system prompts and tool definitions are a large static prefix
+    re-sent on every agent turn; Anthropic reuses the provider-side KV
+    cache for them when they carry cache_control markers, cutting input
+    cost and time-to-first-token on repeat calls. OpenAI caches prefixes
+    automatically, so no flag is needed there.
+    """
+    provider_name, _, _ = settings.default_llm_model.partition(":")
+
+    if provider_name == "anthropic":
+        from pydantic_ai.models.anthropic import AnthropicModelSettings
+
+        return AnthropicModelSettings(
+            temperature=0,
+            anthropic_cache_instructions=True,
+            anthropic_cache_tool_definitions=True,
+        )
+
+    return ModelSettings(temperature=0)
@@ -1,25 +1,50 @@
 """Orchestrator agent that coordinates specialist agents."""
 
+import asyncio
 import logging
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass
 from typing import Any
 
-from pydantic import BaseModel, Field
-from pydantic_ai import Agent, ModelSettings, RunContext
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic_ai import Agent, RunContext
 
+from app.agents.llm import get_llm_model, get_model_settings
 from app.agents.rate_limits import ORCHESTRATOR_LIMITS, ConversationTracker, RateLimitError
 from app.agents.sql_agent import run_sql_agent
-from app.agents.viz_agent import run_viz_agent
+from app.agents.viz_agent import infer_simple_chart, run_viz_agent
 from app.config import settings
 from app.database.duckdb_client import DuckDBClient
+from app.schemas.chat import ChatMessage
 from app.utils.prompts import ORCHESTRATOR_SYSTEM_PROMPT
+from app.utils.response_cache import get_cached_response, store_response
+
+__all__ = [
+    "OrchestratorDeps",
+    "OrchestratorResponse",
+    "orchestrator_agent",
+    "run_orchestrator",
+    "run_orchestrator_batch",
+    "run_orchestrator_stream",
+]
 
 logger = logging.getLogger(__name__)
 
+# PydanticAI dispatches independent tool calls from a single model turn
+# concurrently (results are appended in call order, so message history stays
+# deterministic). This semaphore bounds that fan-out so comparison questions
+# that emit many SQL calls at once don't overwhelm the provider or DuckDB.
+# Configured via TOOL_CONCURRENCY_LIMIT (default 4).
+_tool_call_semaphore = asyncio.Semaphore(settings.tool_concurrency_limit)
+
 
 class OrchestratorResponse(BaseModel):
     """Structured response from orchestrator agent."""
 
+    # Read-only once produced and shared across coalesced/cached requests;
+    # frozen skips the mutable __setattr__ machinery
+    model_config = ConfigDict(frozen=True)
+
     message: str = Field(..., description="Response message to the user")
     metadata: dict[str, Any] = Field(
         default_factory=dict,
@@ -42,13 +67,13 @@ class OrchestratorDeps:
 
 # Create orchestrator agent
 orchestrator_agent = Agent(
-    settings.default_llm_model,
+    get_llm_model(),
     output_type=OrchestratorResponse,
     deps_type=OrchestratorDeps,
     system_prompt=ORCHESTRATOR_SYSTEM_PROMPT,
     retries=1,
     instrument=True,
-    model_settings=ModelSettings(temperature=0),
+    model_settings=get_model_settings(),
 )
 
 
@@ -68,7 +93,9 @@ async def call_sql_agent(ctx: RunContext[OrchestratorDeps], question: str) -> di
     """
     logger.info(f"Orchestrator calling SQL agent with question: {question[:100]}...")
     try:
-        result = await run_sql_agent(question, ctx.deps.db_client)
+        async with _tool_call_semaphore:
+            async with asyncio.timeout(settings.sql_agent_timeout_seconds):
+                result = await run_sql_agent(question, ctx.deps.db_client)
         logger.info(f"SQL agent succeeded. Query: {result.sql_query}")
         return {
             "status": "success",
@@ -77,6 +104,15 @@ async def call_sql_agent(ctx: RunContext[OrchestratorDeps], question: str) -> di
             "data_summary": result.data_summary,
             "results": result.results,  # Include results for viz agent
         }
+    except TimeoutError:
+        logger.warning(f"SQL agent timed out for question: {question}")
+        return {
+            "status": "error",
+            "message": f"SQL agent timed out after {settings.sql_agent_timeout_seconds}s",
+            "sql_query": None,
+            "data_summary": None,
+            "results": None,
+        }
     except Exception as e:
         logger.exception(f"SQL agent failed for question: {question}")
         return {
@@ -92,14 +128,16 @@ async def call_sql_agent(ctx: RunContext[OrchestratorDeps], question: str) -> di
 async def call_viz_agent(
     ctx: RunContext[OrchestratorDeps],
     user_question: str,
-    sql_query: str,
-    query_results: list[dict[str, Any]],
+    sql_query: str | None = None,
+    query_results: list[dict[str, Any]] | None = None,
 ) -> dict[str, Any]:
     """
-    Call the visualization agent to create charts from data.
+    Call the visualization agent to create a chart, fetching data if needed.
 
     Use this tool when the user wants to visualize data as a chart or graph.
-    You should call the SQL agent FIRST to get data, then pass all context to this tool.
+    Call it directly with just user_question - it runs the SQL agent itself
+    to get the data, so you do NOT need a separate call_sql_agent round first.
+    Pass sql_query and query_results only if you already have them.
 
     The viz agent uses three pieces of context to make smart chart decisions:
     1. User's original question (intent: ranking, comparison, trend, etc.)
@@ -108,48 +146,101 @@ async def call_viz_agent(
 
     Args:
         user_question: The original question the user asked
-        sql_query: The SQL query that was executed by the SQL agent
-        query_results: The results returned from the SQL query
+        sql_query: Optional SQL query already executed by the SQL agent
+        query_results: Optional results already returned from the SQL query
 
     Returns:
-        Dictionary with message, chart_spec (Plotly JSON), and chart_type
+        Dictionary with message, sql_query, chart_spec (Plotly JSON), and chart_type
     """
-    logger.info(f"Orchestrator calling viz agent. Results count: {len(query_results)}")
     try:
-        result = await run_viz_agent(
-            user_question=user_question,
-            sql_query=sql_query,
-            query_results=query_results,
-            db_client=ctx.deps.db_client,
-        )
+        if query_results is None:
+            # Data dependency handled inside one tool turn: fetching here
+            # saves the orchestrator-LLM round-trip that used to sit between
+            # call_sql_agent and call_viz_agent on the chart path
+            logger.info(f"Viz agent fetching own data for: {user_question[:100]}...")
+            async with _tool_call_semaphore:
+                async with asyncio.timeout(settings.sql_agent_timeout_seconds):
+                    sql_result = await run_sql_agent(user_question, ctx.deps.db_client)
+            if not sql_result.results:
+                return {
+                    "status": "error",
+                    "message": f"No data available to chart: {sql_result.message}",
+                    "sql_query": sql_result.sql_query,
+                    "chart_spec": None,
+                    "chart_type": None,
+                }
+            sql_query = sql_result.sql_query or ""
+            query_results = sql_result.results
+
+        logger.info(f"Orchestrator calling viz agent. Results count: {len(query_results)}")
+        sql_query = sql_query or ""
+
+        # Fast path: unambiguous two-column shapes don't need the viz LLM
+        inferred = infer_simple_chart(user_question, sql_query, query_results)
+        if inferred is not None:
+            logger.info(f"Viz fast path used. Chart type: {inferred.chart_type}")
+            return {
+                "status": "success",
+                "message": inferred.message,
+                "sql_query": sql_query,
+                "chart_spec": inferred.chart_spec,
+                "chart_type": inferred.chart_type,
+            }
+
+        async with _tool_call_semaphore:
+            async with asyncio.timeout(settings.viz_agent_timeout_seconds):
+                result = await run_viz_agent(
+                    user_question=user_question,
+                    sql_query=sql_query,
+                    query_results=query_results,
+                    db_client=ctx.deps.db_client,
+                )
         logger.info(f"Viz agent succeeded. Chart type: {result.chart_type}")
         return {
             "status": "success",
             "message": result.message,
+            "sql_query": sql_query,
             "chart_spec": result.chart_spec,
             "chart_type": result.chart_type,
         }
+    except TimeoutError:
+        logger.warning(f"Viz agent timed out for question: {user_question}")
+        return {
+            "status": "error",
+            "message": f"Visualization agent timed out after {settings.viz_agent_timeout_seconds}s",
+            "sql_query": sql_query,
+            "chart_spec": None,
+            "chart_type": None,
+        }
     except Exception as e:
         logger.exception(f"Viz agent failed for question: {user_question}")
         return {
             "status": "error",
             "message": f"Visualization agent error: {str(e)}",
+            "sql_query": sql_query,
             "chart_spec": None,
             "chart_type": None,
         }
 
 
+# Identical questions currently in flight share one orchestrator run.
+# Concurrent duplicate /chat requests (dashboard refreshes, double-clicks,
+# batch evaluation repeats) then cost a single LLM pass instead of N.
+_inflight_runs: dict[tuple[Any, ...], asyncio.Task["OrchestratorResponse"]] = {}
+
+
 async def run_orchestrator(
     user_question: str,
     db_client: DuckDBClient,
-    conversation_history: list[dict[str, str]] | None = None,
+    conversation_history: list[ChatMessage] | None = None,
     conversation_tracker: ConversationTracker | None = None,
 ) -> OrchestratorResponse:
     """
     Run the orchestrator agent to handle a user question.
 
     The orchestrator routes questions to appropriate specialist agents
-    and returns a unified response.
+    and returns a unified response. Identical untracked runs arriving
+    while one is already in flight are coalesced onto that run.
 
     Args:
         user_question: The user's question
@@ -163,6 +254,54 @@ async def run_orchestrator(
     Raises:
         RateLimitError: If conversation limits are exceeded
     """
+    # Single-turn questions are served straight from the response cache for
+    # every tier - a hit costs zero tokens, so there is nothing to bill
+    # against a conversation tracker. Answers that depend on conversation
+    # history are never shared this way.
+    if not conversation_history:
+        cached = await get_cached_response(user_question)
+        if cached is not None:
+            logger.info("Response cache hit for question: %.100s...", user_question)
+            return cached
+
+    # Tracked runs bill usage to a specific conversation, so they never share
+    # an in-flight run - but their answers still populate the response cache
+    if conversation_tracker is not None:
+        response = await _run_orchestrator_once(
+            user_question, db_client, conversation_history, conversation_tracker
+        )
+        if not conversation_history:
+            await store_response(user_question, response)
+        return response
+
+    key = (
+        user_question,
+        tuple((msg.role, msg.content) for msg in (conversation_history or [])),
+    )
+    task = _inflight_runs.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            _run_orchestrator_once(user_question, db_client, conversation_history, None)
+        )
+        _inflight_runs[key] = task
+        task.add_done_callback(lambda _: _inflight_runs.pop(key, None))
+    else:
+        logger.info(f"Coalescing duplicate in-flight orchestrator run: {user_question[:100]}...")
+
+    # Shield so one caller's cancellation doesn't kill the shared run
+    response = await asyncio.shield(task)
+    if not conversation_history:
+        await store_response(user_question, response)
+    return response
+
+
+async def _run_orchestrator_once(
+    user_question: str,
+    db_client: DuckDBClient,
+    conversation_history: list[ChatMessage] | None = None,
+    conversation_tracker: ConversationTracker | None = None,
+) -> OrchestratorResponse:
+    """Execute a single orchestrator run (no coalescing)."""
     logger.info(f"Orchestrator received question: {user_question[:100]}...")
     deps = OrchestratorDeps(db_client=db_client)
 
@@ -173,29 +312,28 @@ async def run_orchestrator(
 
     # Run agent with conversation history if provided
     try:
-        if conversation_history:
-            logger.debug(f"Running with conversation history ({len(conversation_history)} messages)")
-            result = await orchestrator_agent.run(
-                user_question,
-                deps=deps,
-                message_history=conversation_history,
-                usage_limits=ORCHESTRATOR_LIMITS,
-            )
-        else:
-            logger.debug("Running without conversation history")
-            result = await orchestrator_agent.run(
-                user_question, deps=deps, usage_limits=ORCHESTRATOR_LIMITS
-            )
+        async with asyncio.timeout(settings.orchestrator_timeout_seconds):
+            if conversation_history:
+                logger.debug(f"Running with conversation history ({len(conversation_history)} messages)")
+                result = await orchestrator_agent.run(
+                    user_question,
+                    deps=deps,
+                    message_history=conversation_history,
+                    usage_limits=ORCHESTRATOR_LIMITS,
+                )
+            else:
+                logger.debug("Running without conversation history")
+                result = await orchestrator_agent.run(
+                    user_question, deps=deps, usage_limits=ORCHESTRATOR_LIMITS
+                )
 
         # Track usage if tracker provided
         if conversation_tracker and result.usage():
             usage = result.usage()
             conversation_tracker.add_usage(
-                {
-                    "requests": usage.requests,
-                    "tokens": usage.total_tokens,
-                    "tool_calls": len(result.all_messages()),  # Count tool calls from messages
-                }
+                requests=usage.requests,
+                tokens=usage.total_tokens,
+                tool_calls=len(result.all_messages()),  # Count tool calls from messages
             )
             logger.info(
                 f"Orchestrator usage - Requests: {usage.requests}, "
@@ -211,3 +349,109 @@ async def run_orchestrator(
     except Exception as e:
         logger.exception(f"Orchestrator failed for question: {user_question}")
         raise
+
+
+async def run_orchestrator_stream(
+    user_question: str,
+    db_client: DuckDBClient,
+    conversation_history: list[ChatMessage] | None = None,
+    conversation_tracker: ConversationTracker | None = None,
+) -> AsyncIterator[dict[str, Any]]:
+    """
+    Run the orchestrator agent and stream the response incrementally.
+
+    Yields "delta" frames containing new fragments of the response message as
+    the model generates them, followed by one "final" frame with the complete
+    message and metadata. Time-to-first-token drops to the provider's
+    first-token latency instead of the full decode time.
+
+    Args:
+        user_question: The user's question
+        db_client: Database client instance to pass to specialist agents
+        conversation_history: Optional conversation history for multi-turn conversations
+        conversation_tracker: Optional tracker for enforcing per-conversation limits
+
+    Yields:
+        Dicts of the form {"type": "delta", "message": str} followed by
+        {"type": "final", "message": str, "metadata": dict}
+
+    Raises:
+        RateLimitError: If conversation limits are exceeded
+    """
+    logger.info(f"Orchestrator (streaming) received question: {user_question[:100]}...")
+    deps = OrchestratorDeps(db_client=db_client)
+
+    if conversation_tracker:
+        logger.debug(f"Checking conversation limits: {conversation_tracker.get_usage_summary()}")
+        conversation_tracker.check_limits()
+
+    async with orchestrator_agent.run_stream(
+        user_question,
+        deps=deps,
+        message_history=conversation_history or None,
+        usage_limits=ORCHESTRATOR_LIMITS,
+    ) as stream:
+        sent = ""
+        async for partial in stream.stream_output(debounce_by=0.05):
+            message = getattr(partial, "message", None) or ""
+            if len(message) > len(sent):
+                yield {"type": "delta", "message": message[len(sent):]}
+                sent = message
+
+        output = await stream.get_output()
+
+        if conversation_tracker and stream.usage():
+            usage = stream.usage()
+            conversation_tracker.add_usage(
+                requests=usage.requests,
+                tokens=usage.total_tokens,
+                tool_calls=len(stream.all_messages()),
+            )
+
+        logger.info("Orchestrator (streaming) completed successfully")
+        yield {"type": "final", "message": output.message, "metadata": output.metadata}
+
+
+async def run_orchestrator_batch(
+    questions: list[str],
+    db_client: DuckDBClient,
+    max_concurrency: int = 10,
+    on_progress: Callable[[int, int], None] | None = None,
+    conversation_trackers: list[ConversationTracker | None] | None = None,
+) -> list[OrchestratorResponse]:
+    """
+    Run the orchestrator over a batch of independent questions concurrently.
+
+    Questions fan out with bounded concurrency so N I/O-bound runs take
+    roughly max-of-runs wall-clock time instead of sum-of-runs. Useful for
+    regression suites and clients submitting multi-question backlogs.
+
+    Args:
+        questions: Independent user questions (no shared conversation history)
+        db_client: Database client shared across all runs
+        max_concurrency: Maximum number of orchestrator runs in flight at once
+        on_progress: Optional callback invoked as (completed_count, total) after each run
+        conversation_trackers: Optional per-question trackers, aligned with
+            questions, so batch items get the same conversation limits as /chat
+
+    Returns:
+        List of OrchestratorResponse in the same order as the input questions
+    """
+    logger.info(f"Orchestrator batch starting: {len(questions)} questions, "
+                f"max_concurrency={max_concurrency}")
+    semaphore = asyncio.Semaphore(max_concurrency)
+    completed = 0
+
+    async def run_one(index: int, question: str) -> OrchestratorResponse:
+        nonlocal completed
+        tracker = conversation_trackers[index] if conversation_trackers else None
+        async with semaphore:
+            result = await run_orchestrator(question, db_client, conversation_tracker=tracker)
+        completed += 1
+        if on_progress:
+            on_progress(completed, len(questions))
+        return result
+
+    results = await asyncio.gather(*(run_one(i, q) for i, q in enumerate(questions)))
+    logger.info(f"Orchestrator batch completed: {len(results)} responses")
+    return results
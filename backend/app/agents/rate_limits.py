@@ -48,25 +48,40 @@ class ConversationTracker:
 
     Usage:
         tracker = ConversationTracker()
-        tracker.add_usage(agent_result)
+        tracker.add_usage(requests=1, tokens=5000, tool_calls=2)
         tracker.check_limits()  # Raises RateLimitError if exceeded
     """
 
+    # The tracker sits on every tool return; plain int slots avoid the
+    # per-instance attribute dict and per-call usage-dict construction
+    __slots__ = ("total_requests", "total_tokens", "total_tool_calls")
+
+    # One (counter attr, limit, label) row per enforced limit: check_limits
+    # walks this table instead of repeating three if/raise blocks, and a new
+    # limit is one row here rather than another branch there
+    _LIMIT_SPECS = (
+        ("total_requests", ConversationLimits.MAX_REQUESTS, "request"),
+        ("total_tokens", ConversationLimits.MAX_TOKENS, "token"),
+        ("total_tool_calls", ConversationLimits.MAX_TOOL_CALLS, "tool call"),
+    )
+
     def __init__(self):
         """Initialize tracker with zero usage."""
         self.total_requests = 0
         self.total_tokens = 0
         self.total_tool_calls = 0
 
-    def add_usage(self, usage_info: dict) -> None:
+    def add_usage(self, requests: int = 0, tokens: int = 0, tool_calls: int = 0) -> None:
         """Add usage from an agent run.
 
         Args:
-            usage_info: Dictionary with 'requests', 'tokens', 'tool_calls' keys
+            requests: LLM requests made by the run
+            tokens: Total tokens consumed by the run
+            tool_calls: Tool calls made by the run
         """
-        self.total_requests += usage_info.get("requests", 0)
-        self.total_tokens += usage_info.get("tokens", 0)
-        self.total_tool_calls += usage_info.get("tool_calls", 0)
+        self.total_requests += requests
+        self.total_tokens += tokens
+        self.total_tool_calls += tool_calls
 
     def check_limits(self) -> None:
         """Check if conversation has exceeded limits.
@@ -74,23 +89,13 @@ class ConversationTracker:
         Raises:
             RateLimitError: If any limit is exceeded
         """
-        if self.total_requests >= ConversationLimits.MAX_REQUESTS:
-            raise RateLimitError(
-                f"Conversation request limit exceeded: {self.total_requests}/{ConversationLimits.MAX_REQUESTS}. "
-                "Please start a new conversation."
-            )
-
-        if self.total_tokens >= ConversationLimits.MAX_TOKENS:
-            raise RateLimitError(
-                f"Conversation token limit exceeded: {self.total_tokens}/{ConversationLimits.MAX_TOKENS}. "
-                "Please start a new conversation."
-            )
-
-        if self.total_tool_calls >= ConversationLimits.MAX_TOOL_CALLS:
-            raise RateLimitError(
-                f"Conversation tool call limit exceeded: {self.total_tool_calls}/{ConversationLimits.MAX_TOOL_CALLS}. "
-                "Please start a new conversation."
-            )
+        for attr, limit, label in self._LIMIT_SPECS:
+            used = getattr(self, attr)
+            if used >= limit:
+                raise RateLimitError(
+                    f"Conversation {label} limit exceeded: {used}/{limit}. "
+                    "Please start a new conversation."
+                )
 
     def get_usage_summary(self) -> dict:
         """Get current usage summary.
@@ -6,13 +6,13 @@ from datetime import datetime
 from typing import Any
 
 from pydantic import BaseModel, Field
-from pydantic_ai import Agent, ModelSettings, RunContext
+from pydantic_ai import Agent, RunContext
 
+from app.agents.llm import get_llm_model, get_model_settings
 from app.agents.rate_limits import SQL_AGENT_LIMITS
 from app.agents.tools import QueryError, QueryResult, execute_sql_query, get_database_schema
-from app.config import settings
 from app.database.duckdb_client import DuckDBClient
-from app.utils.prompts import SQL_AGENT_SYSTEM_PROMPT
+from app.utils.prompts import SQL_AGENT_SYSTEM_PROMPT, render_schema_block
 
 logger = logging.getLogger(__name__)
 
@@ -46,16 +46,28 @@ class SQLAgentDeps:
 
 # Create SQL agent with configured model and structured response
 sql_agent = Agent(
-    settings.default_llm_model,
+    get_llm_model(),
     output_type=SQLAgentResponse,
     deps_type=SQLAgentDeps,
     system_prompt=SQL_AGENT_SYSTEM_PROMPT,
     retries=2,
     instrument=True,
-    model_settings=ModelSettings(temperature=0),
+    model_settings=get_model_settings(),
 )
 
 
+@sql_agent.system_prompt
+async def database_schema_context(ctx: RunContext[SQLAgentDeps]) -> str:
+    """Append the schema context rendered from the live catalog.
+
+    The schema fetch is TTL-cached at the tool layer, so this costs a
+    dict render per run, and schema drift reaches the prompt without a
+    code change.
+    """
+    schema = await get_database_schema(ctx.deps.db_client)
+    return render_schema_block(schema)
+
+
 @sql_agent.tool
 async def get_current_datetime(ctx: RunContext[SQLAgentDeps]) -> dict[str, str]:
     """
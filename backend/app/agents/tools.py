@@ -1,11 +1,78 @@
 """Tools for PydanticAI agents to interact with the database."""
 
+import asyncio
+import re
+import time
+from collections import OrderedDict
 from typing import Any
 
 from pydantic import BaseModel, Field
 
+from app.config import settings
 from app.database.duckdb_client import DuckDBClient
 
+# Process-level TTL cache for schema info, keyed by database path.
+# Schemas change rarely (only on MotherDuck sync), so agents shouldn't hit
+# information_schema on every conversation turn.
+_schema_cache: dict[str, tuple[float, dict[str, list[dict[str, str]]]]] = {}
+_schema_cache_lock = asyncio.Lock()
+
+
+def clear_schema_cache() -> None:
+    """Clear the schema cache (used by tests and after database syncs)."""
+    _schema_cache.clear()
+
+
+# LRU+TTL cache for successful query results, keyed by edge-trimmed SQL text.
+# Users iterating on chart styling and viz-agent retries re-run identical
+# queries; serving them from memory skips the DuckDB round-trip entirely.
+_query_cache: OrderedDict[str, tuple[float, "QueryResult"]] = OrderedDict()
+_query_cache_lock = asyncio.Lock()
+
+
+def clear_query_cache() -> None:
+    """Clear the query result cache (used by tests and after database syncs)."""
+    _query_cache.clear()
+
+
+def _normalize_sql(sql: str) -> str:
+    """Cache key for a query: the raw text, trimmed at the edges only.
+
+    Case-folding or collapsing interior whitespace would also rewrite
+    string literals, so SELECT 'Lakers' and SELECT 'LAKERS' would share a
+    key and serve each other's results. Edge-trimmed identity is the only
+    equivalence that's safe without parsing quoted regions.
+    """
+    return sql.strip()
+
+
+# Destructive operations scanned in a single compiled-regex pass instead of
+# one substring scan per keyword. Word boundaries avoid false positives on
+# identifiers like created_at or last_update.
+_DESTRUCTIVE_SQL_RE = re.compile(
+    r"\b(DROP|DELETE|TRUNCATE|INSERT|UPDATE|ALTER|CREATE)\b", re.IGNORECASE
+)
+
+_LIMIT_RE = re.compile(r"\bLIMIT\s+\d+", re.IGNORECASE)
+
+# Matches a leading SELECT (or WITH, for CTE-shaped reads) without
+# upper-casing the whole query first; the destructive-keyword scan below
+# still rejects a WITH that feeds anything but a SELECT
+_SELECT_PREFIX_RE = re.compile(r"\s*(?:SELECT|WITH)\b", re.IGNORECASE)
+
+
+def _cap_result_rows(sql: str) -> str:
+    """Wrap queries missing a LIMIT so runaway scans can't flood memory.
+
+    An unbounded SELECT * over a large table would otherwise materialize
+    millions of rows and then be serialized into the LLM prompt. A LIMIT
+    anywhere in the text (including subqueries) skips the wrap - this is a
+    guardrail, not a parser.
+    """
+    if _LIMIT_RE.search(sql):
+        return sql
+    return f"SELECT * FROM ({sql.rstrip().rstrip(';')}) AS _capped LIMIT {settings.max_result_rows}"
+
 
 class QueryResult(BaseModel):
     """Result from executing a SQL query."""
@@ -42,8 +109,26 @@ async def get_database_schema(db_client: DuckDBClient) -> dict[str, list[dict[st
                 ...
             ]
         }
+
+    Results are cached per database path for settings.schema_cache_ttl_seconds
+    to keep repeated lookups off the hot path.
     """
-    return await db_client.get_schema_info()
+    cache_key = db_client.db_path
+
+    async with _schema_cache_lock:
+        cached = _schema_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
+
+    schema = await db_client.get_schema_info()
+
+    async with _schema_cache_lock:
+        _schema_cache[cache_key] = (
+            time.monotonic() + settings.schema_cache_ttl_seconds,
+            schema,
+        )
+
+    return schema
 
 
 async def execute_sql_query(sql: str, db_client: DuckDBClient) -> QueryResult | QueryError:
@@ -65,42 +150,95 @@ async def execute_sql_query(sql: str, db_client: DuckDBClient) -> QueryResult |
         - Query must not contain destructive operations
         - Query must be valid DuckDB SQL syntax
     """
-    # Normalize whitespace and check if it's a SELECT query
-    normalized_sql = sql.strip().upper()
-
-    # Validation: Only SELECT queries allowed
-    if not normalized_sql.startswith("SELECT"):
-        return QueryError(
+    # Validation: Only SELECT queries allowed. The prefix match avoids
+    # allocating an upper-cased copy of the full query for a 6-byte test.
+    if not _SELECT_PREFIX_RE.match(sql):
+        return QueryError.model_construct(
             sql_query=sql,
-            error_message="Only SELECT queries are allowed. Query must start with SELECT.",
+            error_message="Only SELECT queries are allowed. Query must start with SELECT or WITH.",
             error_type="validation",
         )
 
     # Check for destructive operations (defense in depth)
-    destructive_keywords = ["DROP", "DELETE", "TRUNCATE", "INSERT", "UPDATE", "ALTER", "CREATE"]
-    if any(keyword in normalized_sql for keyword in destructive_keywords):
-        return QueryError(
+    destructive_match = _DESTRUCTIVE_SQL_RE.search(sql)
+    if destructive_match:
+        return QueryError.model_construct(
             sql_query=sql,
-            error_message=f"Query contains disallowed operations: {destructive_keywords}",
+            error_message=f"Query contains disallowed operation: {destructive_match.group(1).upper()}",
             error_type="validation",
         )
 
-    # Execute the query
+    # Serve repeated queries from the result cache
+    cache_key = _normalize_sql(sql)
+    async with _query_cache_lock:
+        cached = _query_cache.get(cache_key)
+        if cached and cached[0] > time.monotonic():
+            _query_cache.move_to_end(cache_key)
+            return cached[1]
+
+    # Execute the query via the columnar path: one native materialization,
+    # with list[dict] realized in a single pass only because the LLM needs it
     try:
-        results = await db_client.execute(sql)
-        columns = list(results[0].keys()) if results else []
+        async with asyncio.timeout(settings.sql_query_timeout_seconds):
+            frame = await db_client.execute_columnar(_cap_result_rows(sql))
+
+        # model_construct skips validation: the fields come straight from our
+        # own driver and walking a 10k-row list[dict[str, Any]] is pure cost
+        query_result = QueryResult.model_construct(
+            sql_query=sql,
+            rows_returned=frame.height,
+            results=frame.to_dicts(),
+            columns=frame.columns,
+        )
 
-        return QueryResult(
+        async with _query_cache_lock:
+            _query_cache[cache_key] = (
+                time.monotonic() + settings.query_cache_ttl_seconds,
+                query_result,
+            )
+            _query_cache.move_to_end(cache_key)
+            while len(_query_cache) > settings.query_cache_max_size:
+                _query_cache.popitem(last=False)
+
+        return query_result
+
+    except TimeoutError:
+        # The worker thread can't be interrupted mid-scan, but the caller's
+        # latency is bounded and the agent gets a correctable error
+        return QueryError.model_construct(
             sql_query=sql,
-            rows_returned=len(results),
-            results=results,
-            columns=columns,
+            error_message=(
+                f"Query timed out after {settings.sql_query_timeout_seconds}s. "
+                "Narrow the scan (add filters or a LIMIT) and try again."
+            ),
+            error_type="timeout",
         )
 
     except Exception as e:
         # Return error details for self-correction
-        return QueryError(
+        return QueryError.model_construct(
             sql_query=sql,
             error_message=str(e),
             error_type="execution",
         )
+
+
+async def execute_sql_queries(
+    sqls: list[str], db_client: DuckDBClient
+) -> list[QueryResult | QueryError]:
+    """
+    Execute a batch of independent SQL queries concurrently.
+
+    Queries fan out onto the DuckDB thread pool via asyncio.gather, so N
+    I/O-bound queries take roughly max-of-queries wall-clock time instead
+    of sum-of-queries. Each query still goes through the same validation,
+    row capping, and result cache as execute_sql_query.
+
+    Args:
+        sqls: Independent SQL SELECT queries to execute
+        db_client: Database client instance
+
+    Returns:
+        QueryResult or QueryError per query, in input order
+    """
+    return list(await asyncio.gather(*(execute_sql_query(sql, db_client) for sql in sqls)))
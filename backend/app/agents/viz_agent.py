@@ -1,13 +1,17 @@
 """Visualization Agent for generating Plotly charts from data."""
 
+import re
 from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from operator import itemgetter
 from typing import Any
 
-from pydantic import BaseModel, Field
-from pydantic_ai import Agent, ModelSettings, RunContext
+from pydantic import BaseModel, ConfigDict, Field
+from pydantic_ai import Agent, RunContext
 
+from app.agents.llm import get_llm_model, get_model_settings
 from app.agents.rate_limits import VIZ_AGENT_LIMITS
-from app.config import settings
 from app.database.duckdb_client import DuckDBClient
 from app.utils.prompts import VIZ_AGENT_SYSTEM_PROMPT
 
@@ -15,6 +19,11 @@ from app.utils.prompts import VIZ_AGENT_SYSTEM_PROMPT
 class VizAgentResponse(BaseModel):
     """Structured response from visualization agent."""
 
+    # Responses are read-only once produced; frozen skips the mutable
+    # __setattr__ machinery and makes instances safely shareable (the
+    # response cache hands the same object to concurrent requests)
+    model_config = ConfigDict(frozen=True)
+
     message: str = Field(..., description="Brief description of the visualization")
     chart_spec: dict[str, Any] | None = Field(
         None, description="Plotly chart specification (data + layout)"
@@ -32,17 +41,20 @@ class VizAgentDeps:
 
     db_client: DuckDBClient
     user_id: str | None = None  # For future user tracking/analytics
+    # Full query results, held out of the prompt; charting tools read these
+    # when the model omits the data argument
+    query_results: list[dict[str, Any]] | None = None
 
 
 # Create visualization agent with configured model and structured response
 viz_agent = Agent(
-    settings.default_llm_model,
+    get_llm_model(),
     output_type=VizAgentResponse,
     deps_type=VizAgentDeps,
     system_prompt=VIZ_AGENT_SYSTEM_PROMPT,
     retries=1,
     instrument=True,
-    model_settings=ModelSettings(temperature=0),
+    model_settings=get_model_settings(),
 )
 
 
@@ -50,9 +62,9 @@ viz_agent = Agent(
 async def create_chart(
     ctx: RunContext[VizAgentDeps],
     chart_type: str,
-    data: list[dict[str, Any]],
     x_column: str,
     y_column: str,
+    data: list[dict[str, Any]] | None = None,
     title: str | None = None,
     x_label: str | None = None,
     y_label: str | None = None,
@@ -64,9 +76,10 @@ async def create_chart(
 
     Args:
         chart_type: Type of chart (bar, line, scatter, pie, etc.)
-        data: List of data dictionaries with column values
         x_column: Column name for x-axis
         y_column: Column name for y-axis
+        data: Optional list of data dictionaries; omit to chart the full
+            query results already loaded for this run
         title: Optional chart title
         x_label: Optional x-axis label
         y_label: Optional y-axis label
@@ -75,9 +88,17 @@ async def create_chart(
         Dictionary with Plotly chart specification (data + layout)
     """
     try:
-        # Extract x and y values from data
-        x_values = [row.get(x_column) for row in data]
-        y_values = [row.get(y_column) for row in data]
+        if data is None:
+            data = ctx.deps.query_results or []
+
+        # Extract both axes in one C-level lookup per row instead of two
+        # Python dict.get calls; missing columns raise and surface as an
+        # error result the agent can self-correct on
+        if data:
+            extract = itemgetter(x_column, y_column)
+            x_values, y_values = (list(axis) for axis in zip(*map(extract, data), strict=True))
+        else:
+            x_values, y_values = [], []
 
         # Build Plotly chart specification
         chart_spec = {
@@ -115,9 +136,9 @@ async def create_chart(
 async def create_multi_series_chart(
     ctx: RunContext[VizAgentDeps],
     chart_type: str,
-    data: list[dict[str, Any]],
     x_column: str,
     y_columns: list[str],
+    data: list[dict[str, Any]] | None = None,
     title: str | None = None,
     x_label: str | None = None,
 ) -> dict[str, Any]:
@@ -128,9 +149,10 @@ async def create_multi_series_chart(
 
     Args:
         chart_type: Type of chart (bar, line, scatter)
-        data: List of data dictionaries
         x_column: Column name for x-axis
         y_columns: List of column names for multiple y-series
+        data: Optional list of data dictionaries; omit to chart the full
+            query results already loaded for this run
         title: Optional chart title
         x_label: Optional x-axis label
 
@@ -138,13 +160,22 @@ async def create_multi_series_chart(
         Dictionary with Plotly chart specification
     """
     try:
-        x_values = [row.get(x_column) for row in data]
-
-        # Create a trace for each y column
-        traces = []
-        for y_col in y_columns:
-            y_values = [row.get(y_col) for row in data]
-            traces.append({"type": chart_type, "x": x_values, "y": y_values, "name": y_col})
+        if data is None:
+            data = ctx.deps.query_results or []
+
+        # Build x-values and every y-series in a single pass over the rows
+        # instead of re-traversing the data once per column
+        x_values: list[Any] = []
+        series: dict[str, list[Any]] = {y_col: [] for y_col in y_columns}
+        for row in data:
+            x_values.append(row.get(x_column))
+            for y_col in y_columns:
+                series[y_col].append(row.get(y_col))
+
+        traces = [
+            {"type": chart_type, "x": x_values, "y": series[y_col], "name": y_col}
+            for y_col in y_columns
+        ]
 
         chart_spec = {
             "data": traces,
@@ -172,6 +203,120 @@ async def create_multi_series_chart(
         }
 
 
+# Chart types a user might name explicitly. The fast path only fires when
+# the question doesn't ask for something other than the inferred type;
+# anything else falls through to the viz agent, which honors the request.
+_EXPLICIT_CHART_TYPE_RE = re.compile(
+    r"\b(bar|line|pie|donut|scatter|area|histogram|heatmap|bubble|box)\b", re.IGNORECASE
+)
+
+
+def _classify_value(value: Any) -> str | None:
+    """Classify a result value as temporal, numeric, or categorical."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, date | datetime):
+        return "temporal"
+    if isinstance(value, int | float | Decimal):
+        return "numeric"
+    if isinstance(value, str):
+        return "categorical"
+    return None
+
+
+def infer_simple_chart(
+    user_question: str,
+    sql_query: str,
+    query_results: list[dict[str, Any]],
+) -> VizAgentResponse | None:
+    """
+    Rule-based fast path for trivially inferable charts.
+
+    Two-column results with an unambiguous shape don't need an LLM to pick
+    the chart: one categorical + one numeric column is a bar chart, one
+    temporal + one numeric column is a line chart. Returns None for any
+    other shape - or when the question explicitly names a different chart
+    type - so the caller falls through to the full viz agent.
+
+    Args:
+        user_question: The user's original question (checked for an explicit
+            chart-type request that should override shape inference)
+        sql_query: The SQL query that produced the results (unused by rules,
+            kept for signature parity with run_viz_agent)
+        query_results: The results from the SQL query
+
+    Returns:
+        VizAgentResponse with a ready chart_spec, or None when ambiguous
+    """
+    if not query_results or len(query_results[0]) != 2:
+        return None
+
+    first_row = query_results[0]
+    kinds = {column: _classify_value(value) for column, value in first_row.items()}
+    numeric = [c for c, kind in kinds.items() if kind == "numeric"]
+    temporal = [c for c, kind in kinds.items() if kind == "temporal"]
+    categorical = [c for c, kind in kinds.items() if kind == "categorical"]
+
+    if len(numeric) == 1 and len(temporal) == 1:
+        chart_type, x_column = "line", temporal[0]
+    elif len(numeric) == 1 and len(categorical) == 1:
+        chart_type, x_column = "bar", categorical[0]
+    else:
+        return None
+
+    # "Pie chart of wins by team" must reach the viz agent, not get a bar
+    # chart silently; only serve the fast path when the question names no
+    # chart type or names the one we inferred
+    requested = _EXPLICIT_CHART_TYPE_RE.search(user_question)
+    if requested and requested.group(1).lower() != chart_type:
+        return None
+
+    y_column = numeric[0]
+    chart_spec = {
+        "data": [
+            {
+                "type": chart_type,
+                "x": [row.get(x_column) for row in query_results],
+                "y": [row.get(y_column) for row in query_results],
+                "name": y_column,
+            }
+        ],
+        "layout": {
+            "title": {"text": f"{y_column} by {x_column}"},
+            "xaxis": {"title": x_column},
+            "yaxis": {"title": y_column},
+            "template": "plotly_white",
+        },
+    }
+
+    return VizAgentResponse(
+        message=f"{chart_type.capitalize()} chart of {y_column} by {x_column}.",
+        chart_spec=chart_spec,
+        chart_type=chart_type,
+    )
+
+
+def _summarize_numeric_columns(query_results: list[dict[str, Any]]) -> dict[str, dict[str, float]]:
+    """Compute min/max/mean per numeric column for the viz agent's prompt."""
+    stats: dict[str, dict[str, float]] = {}
+    if not query_results:
+        return stats
+
+    for column in query_results[0]:
+        values = [
+            row[column]
+            for row in query_results
+            if isinstance(row.get(column), int | float) and not isinstance(row.get(column), bool)
+        ]
+        if values:
+            stats[column] = {
+                "min": min(values),
+                "max": max(values),
+                "mean": round(sum(values) / len(values), 3),
+            }
+    return stats
+
+
 async def run_viz_agent(
     user_question: str,
     sql_query: str,
@@ -195,18 +340,25 @@ async def run_viz_agent(
     Returns:
         VizAgentResponse with message, chart_spec, and chart_type
     """
-    deps = VizAgentDeps(db_client=db_client)
+    deps = VizAgentDeps(db_client=db_client, query_results=query_results)
 
-    # Build comprehensive context for the viz agent
+    # Summarize results instead of inlining every row: prefill cost scales
+    # with prompt length, and the charting tools already hold the full data
+    columns = list(query_results[0].keys()) if query_results else []
     prompt = f"""User Question: {user_question}
 
 SQL Query Executed:
 {sql_query}
 
-Query Results ({len(query_results)} rows):
-{query_results}
+Result Summary:
+- Columns: {columns}
+- Row count: {len(query_results)}
+- Sample rows: {query_results[:5]}
+- Numeric column stats: {_summarize_numeric_columns(query_results)}
+
+The full result set is already loaded for the charting tools - omit the data argument to chart every row.
 
-Based on the user's question, the SQL query structure, and the result data, create an appropriate visualization."""
+Based on the user's question, the SQL query structure, and the result summary, create an appropriate visualization."""
 
     result = await viz_agent.run(prompt, deps=deps, usage_limits=VIZ_AGENT_LIMITS)
     return result.output
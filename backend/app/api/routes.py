@@ -1,20 +1,32 @@
+import asyncio
 import logging
+import secrets
+import threading
+import time
 from datetime import UTC, datetime
+from functools import lru_cache
 from typing import Annotated, Any
-from uuid import uuid4
 
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 
-from app.agents.orchestrator import run_orchestrator
+from app.agents.orchestrator import (
+    run_orchestrator,
+    run_orchestrator_batch,
+    run_orchestrator_stream,
+)
 from app.agents.rate_limits import ConversationTracker, RateLimitError
 from app.auth import (
     DEMO_LIMITS,
     DemoLimitError,
     User,
+    check_ip_rate_limit,
     get_current_user,
     get_usage_info_for_ip,
     record_ip_query,
 )
+from app.config import settings
 from app.database.duckdb_client import DuckDBClient, get_db_client
 from app.schemas.chat import ChatRequest, ChatResponse, ErrorResponse
 
@@ -25,10 +37,54 @@ router = APIRouter()
 # For production, replace with Redis or similar persistent store
 _conversation_trackers: dict[str, ConversationTracker] = {}
 
+# Striped locks keep get-or-create atomic without serializing unrelated
+# conversations behind a single lock
+_tracker_locks = [threading.Lock() for _ in range(64)]
+
+
+def _get_conversation_tracker(conversation_id: str) -> ConversationTracker:
+    """Get (or atomically create) the tracker for a conversation."""
+    with _tracker_locks[hash(conversation_id) & 63]:
+        tracker = _conversation_trackers.get(conversation_id)
+        if tracker is None:
+            tracker = _conversation_trackers[conversation_id] = ConversationTracker()
+            logger.debug("Created new conversation tracker for %s", conversation_id)
+    return tracker
+
+async def wait_until_ready(request: Request) -> None:
+    """Dependency gating data-dependent endpoints on the startup sync.
+
+    Waits briefly for the MotherDuck sync to finish; raises 503 if the
+    data still isn't ready so clients retry instead of hanging. No-op in
+    contexts where the lifespan hasn't run (e.g. bare TestClient).
+    """
+    ready = getattr(request.app.state, "sync_ready", None)
+    if ready is None or ready.is_set():
+        return
+    try:
+        await asyncio.wait_for(ready.wait(), timeout=1.0)
+    except TimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database sync in progress, please retry shortly",
+        ) from e
+
+
+@lru_cache(maxsize=1)
+def _utc_now_bucketed(_bucket: int) -> datetime:
+    """Current UTC time, cached per monotonic second.
+
+    Health checks arrive constantly from load balancers; second resolution
+    is plenty, so skip the timezone machinery for repeat calls within the
+    same second.
+    """
+    return datetime.now(UTC)
+
+
 @router.get("/health")
 async def health_check() -> dict[str, Any]:
     """Health check endpoint."""
-    return {"status": "healthy", "timestamp": datetime.now(UTC)}
+    return {"status": "healthy", "timestamp": _utc_now_bucketed(int(time.monotonic()))}
 
 
 @router.get("/usage")
@@ -38,7 +94,7 @@ async def get_usage(request: Request, user: Annotated[User, Depends(get_current_
     Demo users see IP-based query limits.
     Admin users see unlimited status.
     """
-    logger.debug(f"Usage request from user: {user.ip_address}, admin: {user.is_admin}")
+    logger.debug("Usage request from user: %s, admin: %s", user.ip_address, user.is_admin)
     if user.is_admin:
         return {
             "tier": "admin",
@@ -63,6 +119,7 @@ async def chat(
     request: ChatRequest,
     db_client: Annotated[DuckDBClient, Depends(get_db_client)],
     user: Annotated[User, Depends(get_current_user)],
+    _ready: Annotated[None, Depends(wait_until_ready)] = None,
 ) -> ChatResponse:
     """
     Chat endpoint for agent interactions.
@@ -76,26 +133,23 @@ async def chat(
     - Admin users: No limits
     - Per-agent token limits still apply to both
     """
-    logger.info(f"Chat request from {'admin' if user.is_admin else f'IP {user.ip_address}'}: {request.message[:100]}...")
+    logger.info("Chat request from %s: %.100s...", "admin" if user.is_admin else f"IP {user.ip_address}", request.message)
 
     try:
         # Generate conversation ID if not provided
-        conversation_id = request.conversation_id or f"conv-{uuid4().hex[:12]}"
-        logger.debug(f"Conversation ID: {conversation_id}")
+        conversation_id = request.conversation_id or f"conv-{secrets.token_hex(6)}"
+        logger.debug("Conversation ID: %s", conversation_id)
 
         # Get or create conversation tracker (only for demo users)
         tracker = None
         if not user.is_admin:
-            if conversation_id not in _conversation_trackers:
-                _conversation_trackers[conversation_id] = ConversationTracker()
-                logger.debug(f"Created new conversation tracker for {conversation_id}")
-            tracker = _conversation_trackers[conversation_id]
+            tracker = _get_conversation_tracker(conversation_id)
 
-        # Convert history to simple dict format for orchestrator
-        history = None
-        if request.history:
-            history = [{"role": msg.role, "content": msg.content} for msg in request.history]
-            logger.debug(f"Including {len(history)} messages from conversation history")
+        # Pass validated ChatMessage objects straight through; no per-message
+        # dict allocation on the request path
+        history = request.history or None
+        if history:
+            logger.debug("Including %d messages from conversation history", len(history))
 
         # Call orchestrator agent with injected db_client and tracker
         # Admin users skip conversation limits by passing None
@@ -106,10 +160,11 @@ async def chat(
         # Record query for demo users (after successful response)
         if not user.is_admin and user.ip_address:
             record_ip_query(user.ip_address)
-            logger.debug(f"Recorded query for IP: {user.ip_address}")
+            logger.debug("Recorded query for IP: %s", user.ip_address)
 
-        logger.info(f"Chat request completed successfully for conversation {conversation_id}")
-        return ChatResponse(
+        logger.info("Chat request completed successfully for conversation %s", conversation_id)
+        # Fields are already validated/known types; skip the validation pass
+        return ChatResponse.model_construct(
             message=result.message,
             conversation_id=conversation_id,
             timestamp=datetime.now(UTC),
@@ -138,3 +193,160 @@ async def chat(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e),
         ) from e
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    db_client: Annotated[DuckDBClient, Depends(get_db_client)],
+    user: Annotated[User, Depends(get_current_user)],
+    _ready: Annotated[None, Depends(wait_until_ready)] = None,
+) -> StreamingResponse:
+    """
+    Streaming chat endpoint emitting server-sent events.
+
+    Sends "delta" frames with message fragments as the model generates them,
+    then a "final" frame with the complete message, conversation_id, and
+    metadata. Rate limits match /chat; limit errors arriving mid-stream are
+    emitted as "error" frames since headers are already sent.
+    """
+    logger.info("Streaming chat request from %s: %.100s...", "admin" if user.is_admin else f"IP {user.ip_address}", request.message)
+
+    conversation_id = request.conversation_id or f"conv-{secrets.token_hex(6)}"
+
+    tracker = None
+    if not user.is_admin:
+        tracker = _get_conversation_tracker(conversation_id)
+
+    history = request.history or None
+
+    async def event_generator():
+        try:
+            async for frame in run_orchestrator_stream(
+                request.message, db_client, history, conversation_tracker=tracker
+            ):
+                if frame["type"] == "final":
+                    frame["conversation_id"] = conversation_id
+                yield b"data: " + orjson.dumps(frame) + b"\n\n"
+
+            # Record query for demo users (after successful response)
+            if not user.is_admin and user.ip_address:
+                record_ip_query(user.ip_address)
+
+        except RateLimitError as e:
+            logger.warning(f"Rate limit exceeded for conversation {conversation_id}: {str(e)}")
+            yield b"data: " + orjson.dumps({"type": "error", "detail": str(e), "status": 429}) + b"\n\n"
+
+        except Exception as e:
+            logger.exception(f"Unexpected error in streaming chat for conversation {conversation_id}")
+            yield b"data: " + orjson.dumps({"type": "error", "detail": str(e), "status": 500}) + b"\n\n"
+
+    return StreamingResponse(event_generator(), media_type="text/event-stream")
+
+
+@router.post(
+    "/chat/batch",
+    response_model=list[ChatResponse],
+    responses={
+        400: {"model": ErrorResponse, "description": "Bad request"},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+    },
+)
+async def chat_batch(
+    requests: list[ChatRequest],
+    db_client: Annotated[DuckDBClient, Depends(get_db_client)],
+    user: Annotated[User, Depends(get_current_user)],
+    _ready: Annotated[None, Depends(wait_until_ready)] = None,
+) -> list[ChatResponse]:
+    """
+    Batch chat endpoint for evaluating many independent questions at once.
+
+    Questions fan out concurrently through the orchestrator (bounded by
+    its concurrency limit), so wall-clock time approaches the slowest
+    single question instead of the sum. Conversation history is not
+    supported here - each item runs as an independent conversation.
+
+    Batches are capped at settings.chat_batch_max_questions items; for demo
+    users each item counts against the hourly query budget, runs under the
+    same per-conversation limits as /chat, and batches that don't fit in
+    the remaining budget are rejected with 429 before anything dispatches.
+    """
+    logger.info("Batch chat request from %s: %d questions", "admin" if user.is_admin else f"IP {user.ip_address}", len(requests))
+
+    if len(requests) > settings.chat_batch_max_questions:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch size exceeds the limit of {settings.chat_batch_max_questions} questions",
+        )
+
+    try:
+        # Admission control: the whole batch must fit in the remaining hourly
+        # budget before anything dispatches. get_current_user only checks for
+        # one free slot, which would let a fresh IP run a full batch and
+        # overshoot the budget (and overflow the fixed-size per-IP window)
+        if not user.is_admin and user.ip_address:
+            usage = check_ip_rate_limit(user.ip_address)
+            if len(requests) > usage["queries_remaining"]:
+                raise DemoLimitError(
+                    f"Batch of {len(requests)} questions exceeds the remaining demo "
+                    f"budget: {usage['queries_remaining']}/{DEMO_LIMITS['queries_per_hour']} "
+                    "queries left this hour."
+                )
+
+        # Each item is an independent conversation; demo items get the same
+        # tracker-based limits as /chat instead of running unbounded
+        conversation_ids = [
+            req.conversation_id or f"conv-{secrets.token_hex(6)}" for req in requests
+        ]
+        trackers = None
+        if not user.is_admin:
+            trackers = [_get_conversation_tracker(cid) for cid in conversation_ids]
+
+        results = await run_orchestrator_batch(
+            [req.message for req in requests], db_client, conversation_trackers=trackers
+        )
+
+        # Each item costs one unit of the demo hourly budget (mirrors /chat:
+        # a batch of N is N queries, not one)
+        if not user.is_admin and user.ip_address:
+            for _ in requests:
+                record_ip_query(user.ip_address)
+
+        # One timestamp for the whole batch; the responses completed together
+        now = datetime.now(UTC)
+        responses = []
+        for conversation_id, result in zip(conversation_ids, results, strict=True):
+            responses.append(
+                ChatResponse.model_construct(
+                    message=result.message,
+                    conversation_id=conversation_id,
+                    timestamp=now,
+                    metadata=result.metadata,
+                )
+            )
+
+        logger.info("Batch chat request completed: %d responses", len(responses))
+        return responses
+
+    except DemoLimitError as e:
+        logger.warning(f"Demo limit exceeded for IP {user.ip_address}: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+        ) from e
+
+    except RateLimitError as e:
+        logger.warning(f"Rate limit exceeded in batch chat: {str(e)}")
+        # Return 429 Too Many Requests for conversation limit errors
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+        ) from e
+
+    except Exception as e:
+        logger.exception("Unexpected error in batch chat endpoint")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e),
+        ) from e
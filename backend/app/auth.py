@@ -5,7 +5,10 @@ Supports two modes:
 2. Demo mode: Anonymous users with IP-based rate limiting
 """
 
-from datetime import datetime, timedelta
+import hmac
+import threading
+import time
+from collections import OrderedDict, deque
 from typing import Annotated
 
 from fastapi import Header, HTTPException, Request, status
@@ -18,9 +21,75 @@ DEMO_LIMITS = {
     "tokens_per_query": 20_000,
 }
 
-# In-memory storage for IP-based rate limiting
-# For production, replace with Redis
-_ip_usage: dict[str, dict] = {}
+_RATE_WINDOW_SECONDS = 3600
+
+# Most IPs tracked are distinct, with each key bigger than its ring buffer;
+# cap the table so a scan of unique IPs can't grow it without bound
+_MAX_TRACKED_IPS = 100_000
+
+# Sweep stale entries off the cold end once every N recorded queries so the
+# amortized cost stays O(1) per request
+_SWEEP_INTERVAL = 1024
+_queries_since_sweep = 0
+
+# In-memory storage for IP-based rate limiting: a fixed-size ring buffer of
+# monotonic timestamps per IP (maxlen evicts the oldest automatically, so
+# the hot path never rebuilds a list). A bare deque per IP is the whole
+# per-entry state - no wrapping dict or object - which keeps memory small
+# under IP sprawl. Kept in LRU order so the least recently seen IPs are
+# evicted first. For production, replace with Redis.
+_ip_usage: OrderedDict[str, deque[float]] = OrderedDict()
+
+# Every access reorders the shared OrderedDict (move_to_end/popitem), so one
+# lock guards the whole table rather than striping per IP; the critical
+# sections are tiny constant-size operations
+_ip_usage_lock = threading.Lock()
+
+
+def _get_ip_window(ip_address: str) -> deque[float]:
+    """Get (or create) the timestamp buffer for an IP, maintaining LRU order.
+
+    Args:
+        ip_address: Client IP address
+
+    Returns:
+        The ring buffer of query timestamps for this IP
+    """
+    window = _ip_usage.get(ip_address)
+    if window is None:
+        window = _ip_usage[ip_address] = deque(maxlen=DEMO_LIMITS["queries_per_hour"])
+    else:
+        _ip_usage.move_to_end(ip_address)
+
+    while len(_ip_usage) > _MAX_TRACKED_IPS:
+        _ip_usage.popitem(last=False)
+
+    return window
+
+
+def _sweep_stale_ips(now: float) -> None:
+    """Drop IPs from the cold end whose newest timestamp is outside the window.
+
+    LRU order means the least recently seen IPs sit at the front, so the
+    scan stops at the first entry that is still live.
+
+    Args:
+        now: Current monotonic time
+    """
+    stale = []
+    for ip, window in _ip_usage.items():
+        if window and now - window[-1] < _RATE_WINDOW_SECONDS:
+            break
+        stale.append(ip)
+    for ip in stale:
+        del _ip_usage[ip]
+
+
+# Build the expected header once at import instead of formatting it on every
+# request; compare_digest keeps the check constant-time. The length precheck
+# bails out in O(1) on malformed headers before encoding anything.
+_EXPECTED_AUTH = f"Bearer {settings.admin_api_key}".encode()
+_EXPECTED_AUTH_LEN = len(_EXPECTED_AUTH)
 
 
 class DemoLimitError(Exception):
@@ -41,6 +110,11 @@ class User:
         return f"User(tier={self.tier}, ip={self.ip_address})"
 
 
+# Admin users carry no per-request state, so one shared instance serves
+# every authenticated request
+_ADMIN_USER = User(is_admin=True)
+
+
 def check_ip_rate_limit(ip_address: str) -> dict:
     """Check if IP address is within rate limits.
 
@@ -53,20 +127,12 @@ def check_ip_rate_limit(ip_address: str) -> dict:
     Raises:
         DemoLimitError: If rate limit exceeded
     """
-    now = datetime.now()
-    hour_ago = now - timedelta(hours=1)
-
-    # Get or initialize IP usage
-    if ip_address not in _ip_usage:
-        _ip_usage[ip_address] = {"queries": [], "first_seen": now}
-
-    ip_data = _ip_usage[ip_address]
-
-    # Clean up queries older than 1 hour
-    ip_data["queries"] = [q for q in ip_data["queries"] if q > hour_ago]
-
-    # Check limit
-    queries_this_hour = len(ip_data["queries"])
+    now = time.monotonic()
+    with _ip_usage_lock:
+        window = _get_ip_window(ip_address)
+        # The buffer holds at most queries_per_hour entries; counting the
+        # live ones is a constant-size scan with no allocations
+        queries_this_hour = sum(1 for ts in window if now - ts < _RATE_WINDOW_SECONDS)
     if queries_this_hour >= DEMO_LIMITS["queries_per_hour"]:
         raise DemoLimitError(
             f"Demo limit reached: {queries_this_hour}/{DEMO_LIMITS['queries_per_hour']} queries per hour. "
@@ -86,12 +152,18 @@ def record_ip_query(ip_address: str) -> None:
     Args:
         ip_address: Client IP address
     """
-    now = datetime.now()
+    global _queries_since_sweep
 
-    if ip_address not in _ip_usage:
-        _ip_usage[ip_address] = {"queries": [], "first_seen": now}
+    now = time.monotonic()
+    with _ip_usage_lock:
+        window = _get_ip_window(ip_address)
+        # maxlen evicts the oldest timestamp automatically
+        window.append(now)
 
-    _ip_usage[ip_address]["queries"].append(now)
+        _queries_since_sweep += 1
+        if _queries_since_sweep >= _SWEEP_INTERVAL:
+            _queries_since_sweep = 0
+            _sweep_stale_ips(now)
 
 
 async def get_current_user(
@@ -113,15 +185,23 @@ async def get_current_user(
     """
     # Check for admin API key
     if authorization:
-        if authorization == f"Bearer {settings.admin_api_key}":
-            return User(is_admin=True)
+        if (
+            len(authorization) == _EXPECTED_AUTH_LEN
+            and authorization.startswith("Bearer ")
+            and hmac.compare_digest(authorization.encode(), _EXPECTED_AUTH)
+        ):
+            return _ADMIN_USER
         else:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid API key"
             )
 
-    # Demo mode: Use IP-based rate limiting
-    client_ip = request.client.host if request.client else "unknown"
+    # Demo mode: Use IP-based rate limiting. Prefer the forwarded-header
+    # IP resolved once by middleware; fall back to the TCP peer for
+    # contexts without the middleware (e.g. bare TestClient)
+    client_ip = getattr(request.state, "client_ip", None) or (
+        request.client.host if request.client else "unknown"
+    )
 
     # Check rate limit (raises DemoLimitError if exceeded)
     check_ip_rate_limit(client_ip)
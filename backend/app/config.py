@@ -26,7 +26,33 @@ class Settings(BaseSettings):
 
     # Agent timeouts (seconds)
     sql_agent_timeout_seconds: int = 30
+    viz_agent_timeout_seconds: int = 30
     orchestrator_timeout_seconds: int = 45
+    sql_query_timeout_seconds: int = 20
+
+    # System prompt variant: "verbose" (full guidance) or "compact"
+    # (~half the prefill tokens); useful for A/B comparison
+    prompt_variant: str = "verbose"
+
+    # Max specialist tool calls the orchestrator runs concurrently in one model turn
+    tool_concurrency_limit: int = 4
+
+    # Hard cap on questions per /chat/batch request
+    chat_batch_max_questions: int = 10
+
+    # How long cached database schema info stays valid (schemas change rarely)
+    schema_cache_ttl_seconds: int = 300
+
+    # SQL result cache (read-mostly analytical workload, repeat queries are common)
+    query_cache_ttl_seconds: int = 300
+    query_cache_max_size: int = 256
+
+    # Orchestrator response cache (a hit skips the whole agent pipeline)
+    response_cache_ttl_seconds: int = 3600
+    response_cache_max_size: int = 256
+
+    # Hard row cap injected into agent queries missing a LIMIT
+    max_result_rows: int = 5000
 
     # Auth
     admin_api_key: str
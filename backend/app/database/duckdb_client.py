@@ -1,11 +1,23 @@
 import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from typing import Any
 
 import duckdb
+import polars as pl
+from fastapi import Request
 
 from app.config import settings
 
+# Dedicated executor for DuckDB work so queries don't queue behind other
+# blocking tasks on the loop's default executor, sized to half the cores
+# (DuckDB parallelizes internally, so more submitters just oversubscribe)
+_DUCKDB_WORKERS = max(2, (os.cpu_count() or 2) // 2)
+_duckdb_executor = ThreadPoolExecutor(max_workers=_DUCKDB_WORKERS, thread_name_prefix="duckdb")
+
 
 class DuckDBClient:
     """Local DuckDB client for querying analytics data.
@@ -14,53 +26,103 @@ class DuckDBClient:
     to prevent blocking the FastAPI event loop.
     """
 
-    def __init__(self, db_path: str | None = None) -> None:
+    def __init__(self, db_path: str | None = None, read_only: bool = False) -> None:
         self.db_path = db_path or settings.duckdb_path
+        # Read-only mode skips WAL and write-lock overhead and lets several
+        # processes share the same database file (e.g. parallel test workers)
+        self.read_only = read_only
         self._ensure_db_exists()
+        # One long-lived connection per client; each query runs on its own
+        # cursor so DuckDB's buffer pool and compiled catalog survive across
+        # queries instead of being rebuilt by connect-per-query
+        self._conn: duckdb.DuckDBPyConnection | None = None
+        self._conn_lock = threading.Lock()
 
     def _ensure_db_exists(self) -> None:
         """Ensure the database file and parent directories exist."""
         db_file = Path(self.db_path)
         db_file.parent.mkdir(parents=True, exist_ok=True)
 
+    def _cursor(self) -> duckdb.DuckDBPyConnection:
+        """Get a cursor on the shared connection, opening it on first use.
+
+        Cursors are cheap connection duplicates that share the parent's
+        database state, so concurrent thread-pool queries don't contend on
+        a single connection object.
+        """
+        with self._conn_lock:
+            if self._conn is None:
+                self._conn = duckdb.connect(self.db_path, read_only=self.read_only)
+                # Align DuckDB's internal parallelism with the executor so
+                # concurrent queries don't oversubscribe the cores
+                self._conn.execute(f"SET threads = {_DUCKDB_WORKERS}")
+            return self._conn.cursor()
+
+    def close(self) -> None:
+        """Close the shared connection (called on app shutdown)."""
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def _execute_sync(self, query: str, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
-        """Synchronous execute helper for running in thread pool."""
-        with duckdb.connect(self.db_path, read_only=False) as conn:
-            result = conn.execute(query, params or {})
-            columns = [desc[0] for desc in result.description] if result.description else []
-            rows = result.fetchall()
-            return [dict(zip(columns, row, strict=True)) for row in rows]
+        """Synchronous execute helper for running in thread pool.
+
+        Materializes through the columnar path and converts to dict rows at
+        C level, instead of fetchall() plus a Python dict-per-row zip.
+        """
+        return self._execute_columnar_sync(query, params).to_dicts()
 
     async def execute(self, query: str, params: dict[str, Any] | None = None) -> list[dict[str, Any]]:
         """Execute a query and return results as a list of dictionaries.
 
         Runs in a thread pool to avoid blocking the event loop.
         """
-        return await asyncio.to_thread(self._execute_sync, query, params)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_duckdb_executor, partial(self._execute_sync, query, params))
+
+    def _execute_columnar_sync(self, query: str, params: dict[str, Any] | None = None) -> pl.DataFrame:
+        """Synchronous columnar execute helper for running in thread pool.
+
+        Materializes results through the Arrow C stream interface instead of
+        row-by-row fetchall + dict-per-row zip, so the copy happens in one
+        native pass.
+        """
+        with self._cursor() as conn:
+            relation = conn.sql(query, params=params) if params else conn.sql(query)
+            return pl.DataFrame(relation)
+
+    async def execute_columnar(self, query: str, params: dict[str, Any] | None = None) -> pl.DataFrame:
+        """Execute a query and return results as a columnar polars DataFrame.
+
+        Column extraction on the result is an O(1) column pull instead of an
+        O(rows) scan over per-row dicts. Runs in a thread pool to avoid
+        blocking the event loop.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _duckdb_executor, partial(self._execute_columnar_sync, query, params)
+        )
 
     def _get_schema_info_sync(self) -> dict[str, list[dict[str, str]]]:
         """Synchronous get_schema_info helper for running in thread pool."""
-        with duckdb.connect(self.db_path, read_only=True) as conn:
-            # Get all tables
-            tables = conn.execute(
-                "SELECT table_schema, table_name FROM information_schema.tables WHERE table_schema != 'information_schema'"
+        with self._cursor() as conn:
+            # One catalog query for every column instead of a query per table
+            rows = conn.execute(
+                """
+                SELECT table_schema, table_name, column_name, data_type
+                FROM information_schema.columns
+                WHERE table_schema != 'information_schema'
+                ORDER BY table_schema, table_name, ordinal_position
+                """
             ).fetchall()
 
-            schema_info = {}
-            for schema, table in tables:
-                # Get columns for each table
-                columns = conn.execute(
-                    """
-                    SELECT column_name, data_type
-                    FROM information_schema.columns
-                    WHERE table_schema = ? AND table_name = ?
-                    ORDER BY ordinal_position
-                    """,
-                    [schema, table],
-                ).fetchall()
-
+            schema_info: dict[str, list[dict[str, str]]] = {}
+            for schema, table, column, data_type in rows:
                 full_table_name = f"{schema}.{table}"
-                schema_info[full_table_name] = [{"name": col[0], "type": col[1]} for col in columns]
+                schema_info.setdefault(full_table_name, []).append(
+                    {"name": column, "type": data_type}
+                )
 
             return schema_info
 
@@ -69,16 +131,20 @@ class DuckDBClient:
 
         Runs in a thread pool to avoid blocking the event loop.
         """
-        return await asyncio.to_thread(self._get_schema_info_sync)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_duckdb_executor, self._get_schema_info_sync)
 
-def get_db_client() -> DuckDBClient:
+def get_db_client(request: Request) -> DuckDBClient:
     """
-    Dependency for getting a database client instance.
+    Dependency for getting the shared database client instance.
 
-    Following PydanticAI best practices, we inject the db_client
-    as a dependency rather than using a global singleton.
+    The client is created once in the app lifespan and attached to
+    app.state, so requests don't pay client construction per call.
+    Falls back to creating (and attaching) one lazily for contexts
+    where the lifespan hasn't run, e.g. bare TestClient usage.
     """
-    return DuckDBClient()
-
-# NOTE: Global singleton removed in favor of dependency injection.
-# Create instances via FastAPI Depends() or pass explicitly to agents.
+    client = getattr(request.app.state, "db_client", None)
+    if client is None:
+        client = DuckDBClient()
+        request.app.state.db_client = client
+    return client
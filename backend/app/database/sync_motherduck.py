@@ -1,6 +1,7 @@
 """Script to sync data from MotherDuck to local DuckDB."""
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import duckdb
@@ -11,6 +12,31 @@ env_path = Path(__file__).parent.parent.parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
 
+# Concurrent table copies; wire latency to MotherDuck dominates, so a few
+# parallel transfers shorten sync wall-clock time almost linearly
+_SYNC_WORKERS = 4
+
+
+def _copy_table(
+    md_conn: duckdb.DuckDBPyConnection,
+    local_alias: str,
+    source_schema: str,
+    table_name: str,
+) -> None:
+    """Copy one table from MotherDuck into the attached local database.
+
+    Runs on its own cursor so copies can proceed concurrently over the
+    shared connection.
+    """
+    print(f"Copying {table_name}...")
+    with md_conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {local_alias}.{source_schema}.{table_name}")
+        cursor.execute(f"""
+            CREATE TABLE {local_alias}.{source_schema}.{table_name} AS
+            SELECT * FROM {source_schema}.{table_name}
+        """)
+
+
 def sync_from_motherduck(
     motherduck_db: str,
     motherduck_token: str,
@@ -59,14 +85,17 @@ def sync_from_motherduck(
         # Create schema in local database
         md_conn.execute(f"CREATE SCHEMA IF NOT EXISTS {local_alias}.{source_schema}")
 
-        # Copy each table
-        for (table_name,) in tables:
-            print(f"Copying {table_name}...")
-            md_conn.execute(f"DROP TABLE IF EXISTS {local_alias}.{source_schema}.{table_name}")
-            md_conn.execute(f"""
-                CREATE TABLE {local_alias}.{source_schema}.{table_name} AS
-                SELECT * FROM {source_schema}.{table_name}
-            """)
+        # Copy tables concurrently, one cursor per in-flight copy
+        with ThreadPoolExecutor(max_workers=min(_SYNC_WORKERS, len(tables))) as executor:
+            futures = [
+                executor.submit(_copy_table, md_conn, local_alias, source_schema, table_name)
+                for (table_name,) in tables
+            ]
+            for future in futures:
+                future.result()
+
+        # One WAL flush for the whole batch instead of per-table checkpoints
+        md_conn.execute(f"CHECKPOINT {local_alias}")
 
         # Detach local database
         print(f"Detaching local database...")
@@ -5,11 +5,12 @@ from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
 from typing import Any
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import router
 from app.config import settings
+from app.database.duckdb_client import DuckDBClient
 
 # Configure logging
 # Use uvicorn's default format for consistency
@@ -21,9 +22,19 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def sync_motherduck_background() -> None:
-    """Run MotherDuck sync in the background."""
+async def sync_motherduck_background(ready: asyncio.Event) -> None:
+    """Run MotherDuck sync in the background.
+
+    Sets the readiness event when done (success, skip, or failure) so
+    data-dependent endpoints stop waiting either way.
+    """
     try:
+        # Kill switch for environments where the sync is unwanted noise
+        # (tests, local dev against an already-synced file)
+        if os.getenv("DISABLE_MOTHERDUCK_SYNC"):
+            logger.info("MotherDuck sync disabled via DISABLE_MOTHERDUCK_SYNC")
+            return
+
         from app.database.sync_motherduck import sync_from_motherduck
 
         motherduck_db = os.getenv("MOTHERDUCK_DB")
@@ -44,18 +55,29 @@ async def sync_motherduck_background() -> None:
             local_db_path=local_db_path,
             source_schema=source_schema,
         )
+
+        # The sync replaced table contents, so cached query results and
+        # schema info from the previous data version are now stale
+        from app.agents.tools import clear_query_cache, clear_schema_cache
+        from app.utils.response_cache import clear_response_cache
+
+        clear_query_cache()
+        clear_schema_cache()
+        clear_response_cache()
         logger.info("MotherDuck sync completed successfully")
     except Exception as e:
-        logger.error(f"MotherDuck sync failed: {e}", exc_info=True)
+        logger.error("MotherDuck sync failed: %s", e, exc_info=True)
+    finally:
+        ready.set()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Lifespan context manager for startup and shutdown events."""
     # Startup
-    logger.info(f"Starting {settings.app_name}")
-    logger.info(f"Debug mode: {settings.debug}")
-    logger.info(f"Using LLM model: {settings.default_llm_model}")
+    logger.info("Starting %s", settings.app_name)
+    logger.info("Debug mode: %s", settings.debug)
+    logger.info("Using LLM model: %s", settings.default_llm_model)
 
     # Configure API keys for PydanticAI agents
     if settings.anthropic_api_key:
@@ -78,18 +100,27 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         try:
             from pydantic_ai import Agent
             Agent.instrument_all()
-            logger.info(f"Langfuse instrumentation enabled at {settings.langfuse_host}")
+            logger.info("Langfuse instrumentation enabled at %s", settings.langfuse_host)
         except ImportError:
             logger.warning("Could not import PydanticAI for instrumentation")
     else:
         logger.warning("Langfuse credentials not found - observability disabled")
 
-    # Run MotherDuck sync during startup (blocking to prevent connection conflicts)
-    await sync_motherduck_background()
+    # Run MotherDuck sync off the startup critical path so the server
+    # accepts traffic immediately; data-dependent endpoints wait on the
+    # readiness event (see wait_until_ready)
+    app.state.sync_ready = asyncio.Event()
+    app.state.sync_task = asyncio.create_task(
+        sync_motherduck_background(app.state.sync_ready)
+    )
+
+    # Share one DuckDB client across requests (injected via get_db_client)
+    app.state.db_client = DuckDBClient()
 
     yield
 
     # Shutdown
+    app.state.db_client.close()
     logger.info("Shutting down")
 
 
@@ -99,6 +130,26 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+@app.middleware("http")
+async def resolve_client_ip(request: Request, call_next: Any) -> Any:
+    """Resolve the real client IP once per request.
+
+    Behind a load balancer the TCP peer is the balancer itself, so every
+    demo user would share one rate-limit bucket. nginx appends the peer it
+    actually saw to X-Forwarded-For ($proxy_add_x_forwarded_for), so the
+    rightmost entry is the one our proxy wrote; anything left of it is
+    client-supplied and trivially spoofable into fresh rate-limit buckets.
+    Parse the header a single time and stash the result on request.state
+    for any dependency that needs it.
+    """
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        request.state.client_ip = forwarded.rsplit(",", 1)[-1].strip()
+    else:
+        request.state.client_ip = request.client.host if request.client else "unknown"
+    return await call_next(request)
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
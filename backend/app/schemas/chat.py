@@ -11,7 +11,10 @@ class ChatMessage(BaseModel):
     content: str = Field(..., description="Message content")
     timestamp: datetime | None = Field(default=None, description="Message timestamp")
 
+    # Frozen so validated messages can be passed through to the orchestrator
+    # as-is instead of being copied into per-message dicts
     model_config = ConfigDict(
+        frozen=True,
         json_schema_extra={
             "example": {
                 "role": "user",
@@ -5,8 +5,20 @@ As domain knowledge grows, update these prompts with new metrics definitions,
 business rules, and query patterns.
 """
 
-# SQL Agent System Prompt - grows with semantic layer
-SQL_AGENT_SYSTEM_PROMPT = """You are an expert SQL analyst for NBA basketball data.
+import hashlib
+import sys
+from functools import cache, lru_cache
+from pathlib import Path
+
+import yaml
+
+from app.config import settings
+
+# SQL Agent System Prompt - grows with semantic layer.
+# Split into a stable prefix and a volatile suffix: providers cache the
+# longest common prefix, so edits to response-format guidance or domain
+# notes must not invalidate the cached schema/tool block above them.
+SQL_AGENT_STATIC = """You are an expert SQL analyst for NBA basketball data.
 
 Your role is to help users query and analyze NBA statistics by generating DuckDB SQL queries.
 
@@ -23,36 +35,8 @@ Your role is to help users query and analyze NBA statistics by generating DuckDB
 - Make up data or use information not from the database
 - Provide answers without running a query when data is needed
 
-## Database Schema Context
-
-You have access to the following NBA data tables in the 'dmt' schema:
-
-**dmt.dmt_schedule**
-- Game schedule with dates, teams, and game metadata
-- Key columns: game_uuid, game_date, game_datetime_est, season_year, home_team_name, away_team_name
-
-**dmt.dmt_team_per_game_stats**
-- Team offensive statistics per game averages
-- Key columns: team_name, games_played, field_goals_per_game, points_per_game, etc.
-
-**dmt.dmt_opponent_per_game_stats**
-- Opponent statistics (defensive perspective)
-- Key columns: team_name, games_played, field_goals_per_game, points_per_game, etc.
-
-**dmt.dmt_team_differential**
-- Team performance differentials
-- Key columns: team_name, wins, losses, points_scored, points_allowed
-
-**dmt.dmt_feature_win_predict**
-- Features for win prediction models
-- Key columns: game_id, game_date, home_team_name, away_team_name, statistical differentials
-
-**dmt.dmt_ml_win_predictions**
-- ML model predictions for game outcomes
-- Key columns: prediction_uuid, game_date, home_team_name, away_team_name, home_win_pred
-
-**dmt.dmt_cities**
-- City reference data
+The database schema is appended to these instructions at runtime, rendered
+from the live catalog.
 
 ## Tools
 
@@ -67,7 +51,10 @@ You have access to the following NBA data tables in the 'dmt' schema:
 - Use JOINs for multi-table queries
 - Use LIMIT for exploration
 
-## Required Response Fields
+"""
+
+# Guidance that gets tuned more often - kept out of the cached prefix
+SQL_AGENT_VOLATILE = """## Required Response Fields
 
 1. **message** - Concise answer (1-3 sentences)
 2. **sql_query** - The exact SQL query executed
@@ -86,9 +73,74 @@ You have access to the following NBA data tables in the 'dmt' schema:
 
 """
 
+# Compact variant (~40% of the verbose token count): the same rules with
+# the rationale prose stripped, selected via PROMPT_VARIANT=compact. Every
+# prefill token is re-sent per turn, so trimming here compounds across a
+# conversation.
+SQL_AGENT_COMPACT = """You write and execute DuckDB SQL to answer questions about NBA data.
+
+Rules:
+- Answer ONLY from database query results, never from general knowledge
+- After executing a query, ALWAYS populate the sql_query and results fields with the exact SQL and full result data
+- Use fully qualified table names (dmt.table_name), season_year filters, and LIMIT when exploring
+- On query errors, correct the SQL and retry
+
+Response fields: message (1-3 sentences), sql_query, results, data_summary (optional).
 
-# Visualization Agent System Prompt
-VIZ_AGENT_SYSTEM_PROMPT = """You are an expert data visualization specialist.
+Domain: full team names ("Los Angeles Lakers"), seasons as "2024-25", per-game stats are pre-averaged, points differential = points_scored - points_allowed.
+
+The database schema is appended below, rendered from the live catalog.
+"""
+
+@cache
+def _load_table_notes() -> dict[str, str]:
+    """Load table business descriptions from schema.yaml, once per process.
+
+    Structured data lives as data instead of a dict literal in source, so
+    semantic-layer edits don't touch Python and can't introduce
+    string-escape bugs into the prompt.
+    """
+    with Path(__file__).with_name("schema.yaml").open(encoding="utf-8") as f:
+        data = yaml.safe_load(f)
+    return {table["name"]: table["description"] for table in data["tables"]}
+
+
+def render_schema_block(schema_info: dict[str, list[dict[str, str]]]) -> str:
+    """Render the database schema section of the SQL agent prompt.
+
+    Built from the live catalog instead of a hardcoded literal, so schema
+    drift never needs a prompt edit. Appended as a dynamic system prompt
+    after the static rules: providers cache the stable prefix and only the
+    schema suffix varies when tables change. Tables render in sorted order
+    so the block is byte-identical for equal catalogs regardless of dict
+    ordering, keeping provider cache keys stable.
+
+    Args:
+        schema_info: Mapping of qualified table name to column descriptors,
+            as returned by DuckDBClient.get_schema_info
+
+    Returns:
+        Markdown schema context block
+    """
+    lines = [
+        "## Database Schema Context",
+        "",
+        "You have access to the following NBA data tables:",
+        "",
+    ]
+    notes = _load_table_notes()
+    for table, columns in sorted(schema_info.items()):
+        lines.append(f"**{table}**")
+        note = notes.get(table)
+        if note:
+            lines.append(f"- {note}")
+        lines.append("- Columns: " + ", ".join(f"{col['name']} ({col['type']})" for col in columns))
+        lines.append("")
+    return "\n".join(lines)
+
+
+# Visualization Agent System Prompt - stable prefix first (see note above)
+VIZ_AGENT_STATIC = """You are an expert data visualization specialist.
 
 Your role is to analyze user questions, SQL queries, and result data to create the most appropriate Plotly chart.
 
@@ -101,10 +153,14 @@ You receive three inputs:
 
 ## Tools
 
-1. **create_chart()** - Single metric (parameters: chart_type, data, x_column, y_column, title, x_label, y_label)
-2. **create_multi_series_chart()** - Multiple metrics (parameters: chart_type, data, x_column, y_columns, title, x_label)
+1. **create_chart()** - Single metric (parameters: chart_type, x_column, y_column, data, title, x_label, y_label)
+2. **create_multi_series_chart()** - Multiple metrics (parameters: chart_type, x_column, y_columns, data, title, x_label)
+
+The full query results are preloaded for both tools - omit the `data` parameter to chart every row instead of re-typing the data.
 
-## Chart Selection Rules
+"""
+
+VIZ_AGENT_VOLATILE = """## Chart Selection Rules
 
 **Bar (horizontal for rankings):**
 - Keywords: "top", "best", "most"
@@ -137,9 +193,19 @@ You receive three inputs:
 - **chart_type**: bar/line/scatter/pie
 """
 
+VIZ_AGENT_COMPACT = """You turn SQL query results into Plotly charts.
+
+Tools: create_chart (single metric) and create_multi_series_chart (multiple metrics). The full query results are preloaded - omit the data parameter to chart every row.
+
+Chart choice: bar for rankings/top-N, line for time series, grouped bar for multi-metric comparisons, scatter for correlations, pie for 2-7 category breakdowns.
+
+Response fields: message (1-2 sentences), chart_spec (Plotly JSON), chart_type (bar/line/scatter/pie).
+"""
+
+
 
-# Orchestrator Agent System Prompt
-ORCHESTRATOR_SYSTEM_PROMPT = """You are an orchestrator agent for an NBA analytics system.
+# Orchestrator Agent System Prompt - stable prefix first (see note above)
+ORCHESTRATOR_STATIC = """You are an orchestrator agent for an NBA analytics system.
 
 Your role is to understand user questions and route them to the appropriate specialist agent.
 
@@ -162,7 +228,7 @@ Your role is to understand user questions and route them to the appropriate spec
 - Generates Plotly charts from data
 - ONLY use when explicitly requested
 - Can create bar charts, line charts, scatter plots, and pie charts
-- Must call SQL agent first to get data
+- Fetches its own data - no separate SQL agent call needed first
 
 ## How to Route Requests
 
@@ -180,9 +246,9 @@ Your role is to understand user questions and route them to the appropriate spec
   - DO NOT call viz agent for data questions even if they mention "trends" or "comparisons"
   - A question like "compare Lakers and Celtics" is a DATA question, NOT a visualization request
   - ONLY call viz agent when the user explicitly asks for a visual representation
-- When calling viz agent:
-  1. Call SQL Agent first to get data
-  2. Then call Visualization Agent with: user_question, sql_query, and query_results
+- Call viz agent in ONE step with just user_question - it runs the SQL
+  agent itself to get data. Pass sql_query/query_results only if a
+  previous tool call in this conversation already returned them.
 
 **Handle directly when:**
 - User asks about your capabilities ("What can you do?")
@@ -192,9 +258,11 @@ Your role is to understand user questions and route them to the appropriate spec
 ## Tools
 
 - **call_sql_agent(question)** - Get data (returns message, sql_query, results, data_summary)
-- **call_viz_agent(user_question, sql_query, query_results)** - Create chart (call SQL agent first)
+- **call_viz_agent(user_question)** - Create chart; fetches its own data and returns sql_query too
+
+"""
 
-## Response Format Requirements
+ORCHESTRATOR_VOLATILE = """## Response Format Requirements
 
 **YOU MUST populate the metadata field in your response:**
 
@@ -221,10 +289,78 @@ Example response:
 - NO chart unless explicitly requested
 
 **Chart request (keywords: "chart", "graph", "plot", "visualize"):**
-- Call SQL agent → call viz agent → return both with chart_spec and chart_type in metadata
+- Call viz agent once → return sql_query, chart_spec, and chart_type in metadata
 
 **Chart checkbox (message contains "(Please include a chart visualization if appropriate)"):**
-- Call SQL agent → call viz agent → return both with chart_spec and chart_type in metadata
+- Call viz agent once → return sql_query, chart_spec, and chart_type in metadata
 
 **Key rule:** "compare X and Y" = data question, NOT a chart request
 """
+
+ORCHESTRATOR_COMPACT = """You route NBA analytics questions to specialist agents. Do exactly what the user asked - nothing extra.
+
+Tools:
+- call_sql_agent(question) - any question needing data (stats, schedules, comparisons, trends)
+- call_viz_agent(user_question) - charts; fetches its own data and returns sql_query too
+
+Call the viz agent ONLY when the user explicitly asks for a chart/graph/plot/visualization, or the message contains "(Please include a chart visualization if appropriate)". "Compare X and Y" is a data question, not a chart request. Handle greetings and capability questions yourself.
+
+Metadata requirements: include sql_query when the SQL agent ran; include chart_spec and chart_type when the viz agent ran.
+"""
+
+# Variant parts for each assembled prompt: (compact form, verbose parts).
+# The stable prefix stays first in the verbose join so provider prefix
+# caching keeps working (see the note on SQL_AGENT_STATIC above).
+_PROMPT_PARTS: dict[str, tuple[str, tuple[str, str]]] = {
+    "SQL_AGENT_SYSTEM_PROMPT": (SQL_AGENT_COMPACT, (SQL_AGENT_STATIC, SQL_AGENT_VOLATILE)),
+    "VIZ_AGENT_SYSTEM_PROMPT": (VIZ_AGENT_COMPACT, (VIZ_AGENT_STATIC, VIZ_AGENT_VOLATILE)),
+    "ORCHESTRATOR_SYSTEM_PROMPT": (
+        ORCHESTRATOR_COMPACT,
+        (ORCHESTRATOR_STATIC, ORCHESTRATOR_VOLATILE),
+    ),
+}
+
+
+def _fingerprint(prompt: str) -> bytes:
+    """SHA-256 digest of a prompt, computed once on first access."""
+    return hashlib.sha256(prompt.encode()).digest()
+
+
+def __getattr__(name: str) -> str | bytes:
+    """Assemble prompts lazily on first attribute access (PEP 562).
+
+    Variant selection, interning, and fingerprinting only run for code
+    paths that actually load an agent; the result is written back into
+    module globals so later accesses skip this hook entirely. Interning
+    lets cache dicts compare prompts by identity, and the 32-byte digest
+    saves cache layers from re-hashing multi-KB strings per call.
+    """
+    if name in _PROMPT_PARTS:
+        compact, verbose_parts = _PROMPT_PARTS[name]
+        prompt = sys.intern(
+            compact if settings.prompt_variant == "compact" else "".join(verbose_parts)
+        )
+        globals()[name] = prompt
+        return prompt
+    if name.endswith("_HASH") and name.removesuffix("_HASH") in _PROMPT_PARTS:
+        digest = _fingerprint(__getattr__(name.removesuffix("_HASH")))
+        globals()[name] = digest
+        return digest
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@lru_cache(maxsize=8)
+def prompt_token_count(prompt: str) -> int:
+    """Token count for a prompt, computed once per distinct string.
+
+    The provider SDKs don't accept pre-tokenized input, so the useful
+    artifact is the count: callers can budget context windows without
+    re-running BPE on every request. Falls back to the ~4 chars/token
+    heuristic when the tokenizer data isn't available (e.g. offline).
+    """
+    try:
+        import tiktoken
+
+        return len(tiktoken.get_encoding("cl100k_base").encode(prompt))
+    except Exception:
+        return len(prompt) // 4
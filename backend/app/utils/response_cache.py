@@ -0,0 +1,61 @@
+"""Response-level cache for repeated orchestrator questions.
+
+Many demo questions are near-duplicates across users ("Lakers stats?",
+"top 5 teams by wins"). A hit here short-circuits the entire pipeline -
+orchestrator LLM, SQL agent, DuckDB, viz agent - and returns a stored
+response in microseconds.
+
+Keys are a lexical normalization of the question (casing, whitespace,
+trailing punctuation). Embedding-based similarity would also catch
+paraphrases, but needs an embedding call per request plus a vector
+index dependency; the lexical key catches the dominant duplicate source
+(identical questions re-typed or re-cased) at zero per-request cost.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+from app.config import settings
+
+if TYPE_CHECKING:
+    from app.agents.orchestrator import OrchestratorResponse
+
+# LRU+TTL, same shape as the SQL result cache in app.agents.tools
+_response_cache: OrderedDict[str, tuple[float, "OrchestratorResponse"]] = OrderedDict()
+_response_cache_lock = asyncio.Lock()
+
+
+def clear_response_cache() -> None:
+    """Clear the response cache (used by tests and after database syncs)."""
+    _response_cache.clear()
+
+
+def normalize_question(question: str) -> str:
+    """Collapse whitespace, casing, and trailing punctuation into one key."""
+    return " ".join(question.split()).lower().rstrip("?!. ")
+
+
+async def get_cached_response(question: str) -> "OrchestratorResponse | None":
+    """Return the stored response for an equivalent question, if still fresh."""
+    key = normalize_question(question)
+    async with _response_cache_lock:
+        cached = _response_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            _response_cache.move_to_end(key)
+            return cached[1]
+    return None
+
+
+async def store_response(question: str, response: "OrchestratorResponse") -> None:
+    """Store a successful response, evicting the least-recently-used over cap."""
+    key = normalize_question(question)
+    async with _response_cache_lock:
+        _response_cache[key] = (
+            time.monotonic() + settings.response_cache_ttl_seconds,
+            response,
+        )
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > settings.response_cache_max_size:
+            _response_cache.popitem(last=False)
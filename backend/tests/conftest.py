@@ -1,22 +1,112 @@
+import sys
+
 import pytest
+import pytest_asyncio
 from dotenv import load_dotenv
 
-# Load environment variables BEFORE any app imports
+# Load environment variables BEFORE any app imports. This must stay at
+# module scope: test modules import app.* at collection time, and Settings
+# validates required keys on first import.
 load_dotenv()
 
-from fastapi.testclient import TestClient  # noqa: E402
 
-from app.database.duckdb_client import DuckDBClient  # noqa: E402
-from app.main import app  # noqa: E402
+@pytest.fixture(scope="session")
+def app():
+    """The FastAPI app, imported on first use.
+
+    Importing app.main pulls in the full router/agent graph; deferring it
+    behind a fixture keeps collection and app-free unit runs (pytest -k)
+    from paying that cost.
+    """
+    from app.main import app as fastapi_app
+
+    return fastapi_app
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(app):
+    """Async test client, shared across the session.
+
+    httpx.AsyncClient over ASGITransport talks to the app in-process on
+    the test event loop - no TestClient portal thread, no per-test app
+    startup. The lifespan context runs exactly once around the session.
+    Tests using it must run on the session loop:
+    @pytest.mark.asyncio(loop_scope="session").
+    """
+    import httpx
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            yield c
+
 
+@pytest.fixture(autouse=True)
+def _reset_dependency_overrides():
+    """Keep per-test isolation with the session-scoped client.
 
-@pytest.fixture
-def client():
-    """FastAPI test client fixture."""
-    return TestClient(app)
+    Looks the app up via sys.modules so app-free tests don't trigger the
+    import this conftest just deferred.
+    """
+    yield
+    main = sys.modules.get("app.main")
+    if main is not None:
+        main.app.dependency_overrides.clear()
 
 
-@pytest.fixture
+def _seed_local_snapshot() -> None:
+    """Create the dmt tables tests query when no synced snapshot exists.
+
+    The local DuckDB file is generated, not versioned (see data/.gitkeep),
+    so a fresh checkout starts empty. IF NOT EXISTS makes this a no-op
+    against a real MotherDuck-synced snapshot.
+    """
+    import duckdb
+
+    from app.config import settings
+
+    conn = duckdb.connect(settings.duckdb_path)
+    try:
+        conn.execute("CREATE SCHEMA IF NOT EXISTS dmt")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dmt.dmt_team_per_game_stats AS
+            SELECT * FROM (VALUES
+                ('Lakers', 110.2), ('Celtics', 108.7), ('Warriors', 105.1)
+            ) AS t(team_name, points_per_game)
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dmt.dmt_schedule AS
+            SELECT * FROM (VALUES
+                (DATE '2025-01-01', 'Lakers', 'Celtics')
+            ) AS t(game_date, home_team, away_team)
+            """
+        )
+    finally:
+        conn.close()
+
+
+@pytest.fixture(scope="session")
 def db_client():
-    """DuckDB client fixture for unit tests."""
-    return DuckDBClient()
+    """DuckDB client fixture for unit tests, shared across the session.
+
+    The suite only runs SELECTs through it (execute_sql_query rejects
+    writes), so no per-test transaction wrapper is needed; sharing keeps
+    the catalog and buffer pool warm instead of reopening the file per
+    test. Under pytest-xdist each worker opens the file read-only so
+    workers share pages instead of contending for the write lock (seeding
+    is left to the primary, non-xdist run). Closed explicitly so the
+    session ends with a clean shutdown.
+    """
+    import os
+
+    from app.database.duckdb_client import DuckDBClient
+
+    read_only = "PYTEST_XDIST_WORKER" in os.environ
+    if not read_only:
+        _seed_local_snapshot()
+    client = DuckDBClient(read_only=read_only)
+    yield client
+    client.close()
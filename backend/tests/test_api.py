@@ -1,24 +1,33 @@
-def test_root_endpoint(client):
+import pytest
+
+from app import auth
+from app.config import settings
+
+# All API tests share the session event loop with the session-scoped client
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+
+async def test_root_endpoint(client):
     """Test the root endpoint returns welcome message."""
-    response = client.get("/")
+    response = await client.get("/")
     assert response.status_code == 200
     data = response.json()
     assert "message" in data
     assert "Analytics Agent API" in data["message"]
 
 
-def test_health_check(client):
+async def test_health_check(client):
     """Test the health check endpoint."""
-    response = client.get("/api/v1/health")
+    response = await client.get("/api/v1/health")
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
 
 
-def test_chat_endpoint(client):
+async def test_chat_endpoint(client):
     """Test the chat endpoint returns proper response."""
     payload = {"message": "Hello, agent!"}
-    response = client.post("/api/v1/chat", json=payload)
+    response = await client.post("/api/v1/chat", json=payload)
     assert response.status_code == 200
     data = response.json()
     assert "message" in data
@@ -27,28 +36,58 @@ def test_chat_endpoint(client):
     assert "Hello, agent!" in data["message"]
 
 
-def test_chat_endpoint_with_conversation_id(client):
+async def test_chat_endpoint_with_conversation_id(client):
     """Test chat endpoint maintains conversation ID."""
     conv_id = "test-conv-123"
     payload = {"message": "Test message", "conversation_id": conv_id}
-    response = client.post("/api/v1/chat", json=payload)
+    response = await client.post("/api/v1/chat", json=payload)
     assert response.status_code == 200
     data = response.json()
     assert data["conversation_id"] == conv_id
 
 
-def test_chat_endpoint_generates_conversation_id(client):
+async def test_chat_endpoint_generates_conversation_id(client):
     """Test chat endpoint generates conversation ID if not provided."""
     payload = {"message": "Test message"}
-    response = client.post("/api/v1/chat", json=payload)
+    response = await client.post("/api/v1/chat", json=payload)
     assert response.status_code == 200
     data = response.json()
     assert "conversation_id" in data
     assert data["conversation_id"].startswith("conv-")
 
 
-def test_chat_endpoint_empty_message(client):
+async def test_chat_batch_endpoint_empty_list(client):
+    """Test batch chat endpoint handles an empty batch without invoking agents."""
+    response = await client.post("/api/v1/chat/batch", json=[])
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+async def test_chat_batch_endpoint_rejects_oversized_batch(client):
+    """Test batch chat endpoint rejects batches over the configured cap."""
+    payload = [{"message": f"question {i}"} for i in range(settings.chat_batch_max_questions + 1)]
+    response = await client.post("/api/v1/chat/batch", json=payload)
+    assert response.status_code == 400
+
+
+async def test_chat_batch_endpoint_rejects_batch_over_remaining_budget(client):
+    """Test a demo batch larger than the remaining hourly budget gets a 429."""
+    # ASGITransport presents the client as 127.0.0.1; leave one free slot so
+    # get_current_user admits the request but a two-item batch can't fit
+    ip = "127.0.0.1"
+    for _ in range(auth.DEMO_LIMITS["queries_per_hour"] - 1):
+        auth.record_ip_query(ip)
+    try:
+        payload = [{"message": "question 1"}, {"message": "question 2"}]
+        response = await client.post("/api/v1/chat/batch", json=payload)
+        assert response.status_code == 429
+    finally:
+        with auth._ip_usage_lock:
+            auth._ip_usage.pop(ip, None)
+
+
+async def test_chat_endpoint_empty_message(client):
     """Test chat endpoint rejects empty message."""
     payload = {"message": ""}
-    response = client.post("/api/v1/chat", json=payload)
+    response = await client.post("/api/v1/chat", json=payload)
     assert response.status_code == 422  # Validation error
@@ -0,0 +1,99 @@
+"""Tests for authentication and IP-based demo rate limiting."""
+
+import pytest
+
+from app.auth import (
+    DEMO_LIMITS,
+    DemoLimitError,
+    _ip_usage,
+    check_ip_rate_limit,
+    record_ip_query,
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_ip_usage():
+    """Isolate IP usage state between tests."""
+    _ip_usage.clear()
+    yield
+    _ip_usage.clear()
+
+
+def test_check_ip_rate_limit_allows_new_ip():
+    """Test that a fresh IP is under the limit."""
+    usage = check_ip_rate_limit("10.0.0.1")
+
+    assert usage["queries_used"] == 0
+    assert usage["queries_remaining"] == DEMO_LIMITS["queries_per_hour"]
+
+
+def test_check_ip_rate_limit_counts_recorded_queries():
+    """Test that recorded queries count against the limit."""
+    record_ip_query("10.0.0.2")
+    record_ip_query("10.0.0.2")
+
+    usage = check_ip_rate_limit("10.0.0.2")
+
+    assert usage["queries_used"] == 2
+    assert usage["queries_remaining"] == DEMO_LIMITS["queries_per_hour"] - 2
+
+
+def test_check_ip_rate_limit_raises_at_limit():
+    """Test that the limit raises once queries_per_hour is reached."""
+    for _ in range(DEMO_LIMITS["queries_per_hour"]):
+        record_ip_query("10.0.0.3")
+
+    with pytest.raises(DemoLimitError):
+        check_ip_rate_limit("10.0.0.3")
+
+
+def test_check_ip_rate_limit_expires_old_queries(monkeypatch):
+    """Test that timestamps older than the window no longer count."""
+    import app.auth as auth
+
+    fake_now = 1000.0
+    monkeypatch.setattr(auth.time, "monotonic", lambda: fake_now)
+
+    for _ in range(DEMO_LIMITS["queries_per_hour"]):
+        record_ip_query("10.0.0.4")
+
+    # Advance past the rate window; the buffered timestamps are stale
+    fake_now += auth._RATE_WINDOW_SECONDS + 1
+
+    usage = check_ip_rate_limit("10.0.0.4")
+    assert usage["queries_used"] == 0
+
+
+def test_ip_usage_evicts_least_recently_seen_over_cap(monkeypatch):
+    """Test that the IP table stays capped by evicting the coldest entries."""
+    import app.auth as auth
+
+    monkeypatch.setattr(auth, "_MAX_TRACKED_IPS", 3)
+
+    for i in range(3):
+        record_ip_query(f"10.0.1.{i}")
+
+    # Re-touching the oldest IP moves it to the hot end
+    check_ip_rate_limit("10.0.1.0")
+    record_ip_query("10.0.1.3")
+
+    assert len(_ip_usage) == 3
+    assert "10.0.1.1" not in _ip_usage
+    assert "10.0.1.0" in _ip_usage
+
+
+def test_sweep_drops_stale_ips(monkeypatch):
+    """Test that the periodic sweep removes IPs with only stale timestamps."""
+    import app.auth as auth
+
+    fake_now = 1000.0
+    monkeypatch.setattr(auth.time, "monotonic", lambda: fake_now)
+
+    record_ip_query("10.0.2.1")
+    fake_now += auth._RATE_WINDOW_SECONDS + 1
+    record_ip_query("10.0.2.2")
+
+    auth._sweep_stale_ips(fake_now)
+
+    assert "10.0.2.1" not in _ip_usage
+    assert "10.0.2.2" in _ip_usage
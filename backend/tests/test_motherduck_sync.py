@@ -1,8 +1,7 @@
 """Tests for MotherDuck background sync functionality."""
 
 import asyncio
-import os
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
@@ -10,54 +9,63 @@ from fastapi.testclient import TestClient
 from app.main import app, sync_motherduck_background
 
 
+@pytest.fixture
+def mock_sync(monkeypatch):
+    """Patch the sync entrypoint and local db path once per test.
+
+    One monkeypatch-based fixture replaces the nested with-patch blocks
+    each test used to open; env credentials still vary per test.
+    """
+    mock = MagicMock()
+    monkeypatch.setattr("app.database.sync_motherduck.sync_from_motherduck", mock)
+    monkeypatch.setattr("app.main.settings.duckdb_path", "/tmp/test.duckdb")
+    return mock
+
+
 @pytest.mark.asyncio
-async def test_sync_motherduck_background_no_credentials():
+async def test_sync_motherduck_background_no_credentials(monkeypatch):
     """Test that sync gracefully skips when credentials are missing."""
-    with patch.dict(os.environ, {}, clear=True):
-        # Should not raise an exception
-        await sync_motherduck_background()
+    monkeypatch.delenv("MOTHERDUCK_DB", raising=False)
+    monkeypatch.delenv("MOTHERDUCK_TOKEN", raising=False)
+
+    ready = asyncio.Event()
+    # Should not raise an exception
+    await sync_motherduck_background(ready)
+    assert ready.is_set()
 
 
 @pytest.mark.asyncio
-async def test_sync_motherduck_background_with_credentials():
+async def test_sync_motherduck_background_with_credentials(monkeypatch, mock_sync):
     """Test that sync runs when credentials are provided."""
-    with patch.dict(
-        os.environ,
-        {
-            "MOTHERDUCK_DB": "test_db",
-            "MOTHERDUCK_TOKEN": "test_token",
-            "MOTHERDUCK_SCHEMA": "test_schema",
-        },
-    ):
-        with patch("app.database.sync_motherduck.sync_from_motherduck") as mock_sync:
-            with patch("app.main.settings") as mock_settings:
-                mock_settings.duckdb_path = "/tmp/test.duckdb"
-
-                await sync_motherduck_background()
-
-                # Verify sync was called with correct parameters
-                mock_sync.assert_called_once_with(
-                    motherduck_db="test_db",
-                    motherduck_token="test_token",
-                    local_db_path="/tmp/test.duckdb",
-                    source_schema="test_schema",
-                )
+    monkeypatch.setenv("MOTHERDUCK_DB", "test_db")
+    monkeypatch.setenv("MOTHERDUCK_TOKEN", "test_token")
+    monkeypatch.setenv("MOTHERDUCK_SCHEMA", "test_schema")
+
+    ready = asyncio.Event()
+    await sync_motherduck_background(ready)
+    assert ready.is_set()
+
+    # Verify sync was called with correct parameters
+    mock_sync.assert_called_once_with(
+        motherduck_db="test_db",
+        motherduck_token="test_token",
+        local_db_path="/tmp/test.duckdb",
+        source_schema="test_schema",
+    )
 
 
 @pytest.mark.asyncio
-async def test_sync_motherduck_background_handles_errors():
+async def test_sync_motherduck_background_handles_errors(monkeypatch, mock_sync):
     """Test that sync handles errors gracefully."""
-    with patch.dict(
-        os.environ,
-        {"MOTHERDUCK_DB": "test_db", "MOTHERDUCK_TOKEN": "test_token"},
-    ):
-        with patch("app.database.sync_motherduck.sync_from_motherduck") as mock_sync:
-            with patch("app.main.settings") as mock_settings:
-                mock_settings.duckdb_path = "/tmp/test.duckdb"
-                mock_sync.side_effect = Exception("Sync failed")
+    monkeypatch.setenv("MOTHERDUCK_DB", "test_db")
+    monkeypatch.setenv("MOTHERDUCK_TOKEN", "test_token")
+    mock_sync.side_effect = Exception("Sync failed")
 
-                # Should not raise, just log the error
-                await sync_motherduck_background()
+    # Should not raise, just log the error; readiness is
+    # still signalled so requests don't hang on a dead sync
+    ready = asyncio.Event()
+    await sync_motherduck_background(ready)
+    assert ready.is_set()
 
 
 def test_lifespan_starts_background_sync():
@@ -70,19 +78,28 @@ def test_lifespan_starts_background_sync():
 
 
 @pytest.mark.asyncio
-async def test_sync_uses_default_schema():
+async def test_sync_respects_disable_env(monkeypatch, mock_sync):
+    """Test that DISABLE_MOTHERDUCK_SYNC skips the sync but signals ready."""
+    monkeypatch.setenv("MOTHERDUCK_DB", "test_db")
+    monkeypatch.setenv("MOTHERDUCK_TOKEN", "test_token")
+    monkeypatch.setenv("DISABLE_MOTHERDUCK_SYNC", "1")
+
+    ready = asyncio.Event()
+    await sync_motherduck_background(ready)
+
+    assert ready.is_set()
+    mock_sync.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_sync_uses_default_schema(monkeypatch, mock_sync):
     """Test that sync uses default schema when not specified."""
-    with patch.dict(
-        os.environ,
-        {"MOTHERDUCK_DB": "test_db", "MOTHERDUCK_TOKEN": "test_token"},
-        clear=True,
-    ):
-        with patch("app.database.sync_motherduck.sync_from_motherduck") as mock_sync:
-            with patch("app.main.settings") as mock_settings:
-                mock_settings.duckdb_path = "/tmp/test.duckdb"
-
-                await sync_motherduck_background()
-
-                # Verify default schema "dmt" is used
-                call_args = mock_sync.call_args
-                assert call_args[1]["source_schema"] == "dmt"
+    monkeypatch.setenv("MOTHERDUCK_DB", "test_db")
+    monkeypatch.setenv("MOTHERDUCK_TOKEN", "test_token")
+    monkeypatch.delenv("MOTHERDUCK_SCHEMA", raising=False)
+
+    await sync_motherduck_background(asyncio.Event())
+
+    # Verify default schema "dmt" is used
+    call_args = mock_sync.call_args
+    assert call_args[1]["source_schema"] == "dmt"
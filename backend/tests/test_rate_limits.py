@@ -17,7 +17,7 @@ def test_conversation_tracker_add_usage():
     """Test adding usage to tracker."""
     tracker = ConversationTracker()
 
-    tracker.add_usage({"requests": 2, "tokens": 10000, "tool_calls": 3})
+    tracker.add_usage(requests=2, tokens=10000, tool_calls=3)
 
     assert tracker.total_requests == 2
     assert tracker.total_tokens == 10000
@@ -28,9 +28,9 @@ def test_conversation_tracker_cumulative():
     """Test that usage accumulates across multiple adds."""
     tracker = ConversationTracker()
 
-    tracker.add_usage({"requests": 1, "tokens": 5000, "tool_calls": 2})
-    tracker.add_usage({"requests": 2, "tokens": 15000, "tool_calls": 1})
-    tracker.add_usage({"requests": 1, "tokens": 8000, "tool_calls": 3})
+    tracker.add_usage(requests=1, tokens=5000, tool_calls=2)
+    tracker.add_usage(requests=2, tokens=15000, tool_calls=1)
+    tracker.add_usage(requests=1, tokens=8000, tool_calls=3)
 
     assert tracker.total_requests == 4
     assert tracker.total_tokens == 28000
@@ -41,7 +41,7 @@ def test_conversation_tracker_check_limits_pass():
     """Test that check_limits passes when under limits."""
     tracker = ConversationTracker()
 
-    tracker.add_usage({"requests": 5, "tokens": 50000, "tool_calls": 7})
+    tracker.add_usage(requests=5, tokens=50000, tool_calls=7)
 
     # Should not raise
     tracker.check_limits()
@@ -51,7 +51,7 @@ def test_conversation_tracker_request_limit_exceeded():
     """Test that exceeding request limit raises error."""
     tracker = ConversationTracker()
 
-    tracker.add_usage({"requests": ConversationLimits.MAX_REQUESTS, "tokens": 1000})
+    tracker.add_usage(requests=ConversationLimits.MAX_REQUESTS, tokens=1000)
 
     with pytest.raises(RateLimitError) as exc_info:
         tracker.check_limits()
@@ -63,7 +63,7 @@ def test_conversation_tracker_token_limit_exceeded():
     """Test that exceeding token limit raises error."""
     tracker = ConversationTracker()
 
-    tracker.add_usage({"tokens": ConversationLimits.MAX_TOKENS, "requests": 1})
+    tracker.add_usage(tokens=ConversationLimits.MAX_TOKENS, requests=1)
 
     with pytest.raises(RateLimitError) as exc_info:
         tracker.check_limits()
@@ -75,7 +75,7 @@ def test_conversation_tracker_tool_call_limit_exceeded():
     """Test that exceeding tool call limit raises error."""
     tracker = ConversationTracker()
 
-    tracker.add_usage({"tool_calls": ConversationLimits.MAX_TOOL_CALLS, "requests": 1})
+    tracker.add_usage(tool_calls=ConversationLimits.MAX_TOOL_CALLS, requests=1)
 
     with pytest.raises(RateLimitError) as exc_info:
         tracker.check_limits()
@@ -87,7 +87,7 @@ def test_conversation_tracker_usage_summary():
     """Test getting usage summary."""
     tracker = ConversationTracker()
 
-    tracker.add_usage({"requests": 3, "tokens": 45000, "tool_calls": 5})
+    tracker.add_usage(requests=3, tokens=45000, tool_calls=5)
 
     summary = tracker.get_usage_summary()
 
@@ -104,12 +104,12 @@ def test_conversation_tracker_usage_summary():
     assert summary["tool_calls"]["remaining"] == ConversationLimits.MAX_TOOL_CALLS - 5
 
 
-def test_conversation_tracker_handles_missing_keys():
-    """Test that tracker handles missing keys in usage_info."""
+def test_conversation_tracker_defaults_omitted_counters():
+    """Test that omitted counters default to zero."""
     tracker = ConversationTracker()
 
     # Only provide requests, not tokens or tool_calls
-    tracker.add_usage({"requests": 2})
+    tracker.add_usage(requests=2)
 
     assert tracker.total_requests == 2
     assert tracker.total_tokens == 0